@@ -8,23 +8,322 @@ import codecs
 import random
 import string
 import math
+import re
+import sqlite3
+import tempfile
+import time
+import shutil
+import zipfile
+import zlib
+import threading
+import struct
+import lzma
+import gzip
+import bz2
+import queue
+import html
+import functools
+import hashlib
+import asyncio
+import logging
+from logging.handlers import RotatingFileHandler
+from array import array
+from stat import S_ISDIR
 # import torch
 import numpy as np
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, Future, CancelledError, as_completed, wait, FIRST_COMPLETED
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QLineEdit, QPushButton, QFileDialog, QTextEdit,
+                             QLabel, QLineEdit, QPushButton, QFileDialog, QPlainTextEdit,
                              QProgressBar, QMessageBox, QCheckBox, QGroupBox, QComboBox,
-                             QListWidget, QListWidgetItem, QAbstractItemView, QMenu, QAction,
-                             QSplitter, QSizePolicy, QTabWidget, QSpinBox)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSettings, QDir, QTimer
-from PyQt5.QtGui import QIcon, QColor
-from threading import Lock
+                             QListView, QAbstractItemView, QMenu, QAction,
+                             QSplitter, QSizePolicy, QTabWidget, QSpinBox, QInputDialog,
+                             QDialog, QFormLayout, QDialogButtonBox, QTableWidget, QTableWidgetItem,
+                             QHeaderView)
+from PyQt5.QtCore import (Qt, QThread, pyqtSignal, QSettings, QDir, QTimer,
+                          QAbstractListModel, QModelIndex, QSortFilterProxyModel)
+from PyQt5.QtGui import QIcon, QColor, QFont
+from threading import Lock, Condition, Thread
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.cluster import KMeans
-from collections import defaultdict
+from collections import defaultdict, deque
 
 
+# 字典列表项的“置顶优先”标记
+PINNED_ROLE = Qt.UserRole + 1
+# 压缩文件列表项的调度设置（优先级/权重/截止时间）
+SCHEDULE_ROLE = Qt.UserRole + 2
+METADATA_ROLE = Qt.UserRole + 3
+ARCHIVE_EXTENSIONS = ('.7z', '.zip', '.rar', '.tar', '.gz', '.bz2', '.xz', '.cab', '.arj', '.z', '.lzh', '.iso')
+DEFAULT_ARCHIVE_SCHEDULE = {"priority": 0, "weight": 1, "deadline_minutes": 0}
+
+
+def read_found_passwords(log_file, limit=None):
+    """从密码日志中读取已找到的密码，最近的在前，去重"""
+    passwords = []
+    if not os.path.exists(log_file):
+        return passwords
+    try:
+        with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
+            lines = f.readlines()
+    except Exception as e:
+        print(f"读取密码日志 {log_file} 失败: {str(e)}")
+        return passwords
+
+    seen = set()
+    for line in reversed(lines):
+        # 格式: 时间 | 压缩文件 | 密码: xxx
+        marker = line.find("| 密码: ")
+        if marker < 0:
+            continue
+        password = line[marker + len("| 密码: "):].rstrip("\r\n")
+        if password and password not in seen:
+            seen.add(password)
+            passwords.append(password)
+            if limit and len(passwords) >= limit:
+                break
+    return passwords
+
+
+# 密码日志：命中后由破解线程直接追加并落盘，不等待界面
+class PasswordLog:
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+
+    def record(self, archive_path, password):
+        """一次写入完整的一行并 fsync，多个线程互斥"""
+        self.record_many([(archive_path, password)])
+
+    def record_many(self, pairs):
+        """批量写入多行 (压缩文件, 密码)，只 fsync 一次"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        lines = "".join(f"{timestamp} | {archive_path} | 密码: {password}\n" for archive_path, password in pairs)
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+# 字典行数缓存（按 路径/大小/修改时间），多个压缩文件任务共享，避免重复计数
+_line_count_cache = {}
+_line_count_lock = Lock()
+
+
+def count_file_lines(file_path):
+    """按字节块统计文件行数（不解码），结果缓存
+
+    压缩字典在完整读取一遍之前按压缩比估算
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return 0
+    key = (file_path, stat.st_size, stat.st_mtime)
+    with _line_count_lock:
+        if key in _line_count_cache:
+            return _line_count_cache[key]
+
+    if is_compressed_dictionary(file_path):
+        ratio = COMPRESSED_DICT_EXTENSIONS[os.path.splitext(file_path)[1].lower()]
+        return max(1, int(stat.st_size * ratio / 10))  # 按平均每行10字节估算
+
+    count = 0
+    last = b"\n"
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            count += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        count += 1
+
+    with _line_count_lock:
+        _line_count_cache[key] = count
+    return count
+
+
+def record_line_count(file_path, count):
+    """记录完整读取后得到的准确行数（用于压缩字典）"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return
+    with _line_count_lock:
+        _line_count_cache[(file_path, stat.st_size, stat.st_mtime)] = count
+
+
+# 压缩字典扩展名 -> 估计压缩比
+COMPRESSED_DICT_EXTENSIONS = {'.gz': 3.0, '.bz2': 3.5, '.xz': 4.0, '.lzma': 4.0, '.7z': 4.0}
+
+
+def is_compressed_dictionary(path):
+    return os.path.splitext(path)[1].lower() in COMPRESSED_DICT_EXTENSIONS
+
+
+# 压缩字典流式读取：.7z 由 7z x -so 子进程解压，gz/bz2/xz 在读取线程中解压（解压时释放GIL），
+# 按批放入有界队列，解压与密码验证并行，不需要先解压到磁盘
+class CompressedDictionaryReader:
+    BATCH_LINES = 4096
+    OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open, '.lzma': lzma.open}
+
+    def __init__(self, path, seven_zip_path="7z.exe", queue_size=16):
+        self.path = path
+        self.queue = queue.Queue(queue_size)
+        self.stopped = threading.Event()
+        self.error = None
+        self.process = None
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.7z':
+            self.process = subprocess.Popen([seven_zip_path, 'x', '-so', '-y', path],
+                                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                            stdin=subprocess.DEVNULL)
+            stream = self.process.stdout
+        else:
+            stream = self.OPENERS[ext](path, 'rb')
+        self.thread = Thread(target=self._read, args=(stream,), daemon=True)
+        self.thread.start()
+
+    def _read(self, stream):
+        try:
+            with stream:
+                batch = []
+                for raw in stream:
+                    batch.append(raw)
+                    if len(batch) >= self.BATCH_LINES:
+                        if not self._put(batch):
+                            return
+                        batch = []
+                if batch:
+                    self._put(batch)
+            if self.process and self.process.wait() != 0 and not self.stopped.is_set():
+                self.error = RuntimeError(f"7z 解压字典失败 (退出码 {self.process.returncode})")
+        except Exception as e:
+            self.error = e
+        finally:
+            self._put(None)
+
+    def _put(self, item):
+        """队列满时等待，已关闭时放弃"""
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self):
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                break
+            yield from batch
+        if self.error:
+            raise self.error
+
+    def close(self):
+        self.stopped.set()
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# 字典编码缓存（按 路径/大小/修改时间）
+_encoding_cache = {}
+_encoding_lock = Lock()
+
+
+def guess_encoding(sample):
+    """根据BOM、UTF-8合法性和GBK解码错误数判断编码，返回codecs可用的编码名"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith(codecs.BOM_UTF16_LE) or sample.startswith(codecs.BOM_UTF16_BE):
+        return 'utf-16'
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        sample.decode('gbk')
+        return 'gbk'
+    except UnicodeDecodeError:
+        pass
+    # 两者都有非法字节时取错误较少的一个
+    return min(('utf-8', 'gbk'), key=lambda encoding: sample.decode(encoding, errors='replace').count('\ufffd'))
+
+
+def read_dictionary_sample(path, size, seven_zip_path=None):
+    """读取字典开头的若干字节（压缩字典读取解压后的数据）"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.7z':
+        if not seven_zip_path:
+            return b""
+        process = subprocess.Popen([seven_zip_path, 'x', '-so', '-y', path], stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+        try:
+            return process.stdout.read(size)
+        finally:
+            process.kill()
+            process.stdout.close()
+            process.wait()
+    opener = CompressedDictionaryReader.OPENERS.get(ext, open)
+    with opener(path, 'rb') as f:
+        return f.read(size)
+
+
+def detect_dictionary_encoding(path, seven_zip_path=None, sample_size=1 << 20):
+    """检测字典编码（只读取开头1MB），结果缓存"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 'utf-8'
+    key = (path, stat.st_size, stat.st_mtime)
+    with _encoding_lock:
+        if key in _encoding_cache:
+            return _encoding_cache[key]
+
+    try:
+        sample = read_dictionary_sample(path, sample_size, seven_zip_path)
+    except Exception as e:
+        print(f"读取字典 {path} 失败: {str(e)}")
+        return 'utf-8'
+    if len(sample) == sample_size and b"\n" in sample:
+        sample = sample[:sample.rindex(b"\n") + 1]  # 去掉末尾可能被截断的多字节字符
+    encoding = guess_encoding(sample)
+
+    with _encoding_lock:
+        _encoding_cache[key] = encoding
+    return encoding
+
+
+def iter_dictionary_words(path, seven_zip_path="7z.exe"):
+    """逐行生成字典中的非空单词（去掉首尾空白），压缩字典边解压边读取
+
+    供AI学习、频率排序等不需要字节偏移的功能使用
+    """
+    encoding = detect_dictionary_encoding(path, seven_zip_path)
+    if not is_compressed_dictionary(path):
+        with codecs.open(path, 'r', encoding=encoding, errors='ignore') as f:
+            for line in f:
+                word = line.strip()
+                if word:
+                    yield word
+        return
+    if encoding == 'utf-16':
+        raise ValueError(f"压缩字典 {os.path.basename(path)} 为UTF-16编码，无法逐行读取")
+    with CompressedDictionaryReader(path, seven_zip_path) as reader:
+        for raw in reader:
+            word = raw.decode(encoding, errors='ignore').strip()
+            if word:
+                yield word
 
 
 # AI密码生成器类
@@ -43,16 +342,14 @@ class AIPasswordGenerator:
             't': ['7']
         }
     
-    def learn_from_multiple_dictionaries(self, dict_paths, progress_callback=None):
+    def learn_from_multiple_dictionaries(self, dict_paths, progress_callback=None, seven_zip_path="7z.exe"):
         """从多个字典文件学习密码模式"""
         all_passwords = []
         total_files = len(dict_paths)
         
         for i, dict_path in enumerate(dict_paths, 1):
             try:
-                with codecs.open(dict_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    passwords = [line.strip() for line in f if line.strip()]
-                    all_passwords.extend(passwords)
+                all_passwords.extend(iter_dictionary_words(dict_path, seven_zip_path))
                 
                 if progress_callback:
                     progress_callback(i, total_files)
@@ -115,11 +412,10 @@ class AIPasswordGenerator:
                 
         return len(self.password_patterns) > 0
 
-    def learn_from_dictionary(self, dict_path):
+    def learn_from_dictionary(self, dict_path, seven_zip_path="7z.exe"):
         """从字典文件学习密码模式"""
         try:
-            with codecs.open(dict_path, 'r', encoding='utf-8', errors='ignore') as f:
-                passwords = [line.strip() for line in f if line.strip()]
+            passwords = list(iter_dictionary_words(dict_path, seven_zip_path))
             
             if len(passwords) < 10:  # 太小的样本不学习
                 return
@@ -223,6 +519,1974 @@ class AIPasswordGenerator:
         
         return passwords
 
+
+# 流式密码写入器（磁盘去重，仅追加写入）
+class StreamingPasswordWriter:
+    def __init__(self, file_path, chunk_size=10000):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.written = 0
+        self.existing = 0
+        self._db = None
+        self._db_path = None
+        self._file = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        """打开输出文件，并用已有内容初始化去重索引"""
+        # 去重索引放在临时SQLite文件中，内存占用与密码数量无关
+        fd, self._db_path = tempfile.mkstemp(suffix=".dedup.db",
+                                             dir=os.path.dirname(os.path.abspath(self.file_path)))
+        os.close(fd)
+        self._db = sqlite3.connect(self._db_path)
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("CREATE TABLE seen (pwd TEXT PRIMARY KEY) WITHOUT ROWID")
+
+        needs_newline = False
+        if os.path.exists(self.file_path):
+            with open(self.file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                chunk = []
+                for line in f:
+                    needs_newline = not line.endswith("\n")
+                    line = line.strip()
+                    if line:
+                        chunk.append((line,))
+                    if len(chunk) >= self.chunk_size:
+                        self._seed(chunk)
+                        chunk = []
+                self._seed(chunk)
+
+        self._file = open(self.file_path, 'a', encoding='utf-8')
+        if needs_newline:
+            self._file.write("\n")
+
+    def _seed(self, rows):
+        if not rows:
+            return
+        before = self._db.total_changes
+        self._db.executemany("INSERT OR IGNORE INTO seen (pwd) VALUES (?)", rows)
+        self._db.commit()
+        self.existing += self._db.total_changes - before
+
+    def write_batch(self, passwords):
+        """写入一批密码，返回其中新写入（未重复）的数量"""
+        new_passwords = []
+        cursor = self._db.cursor()
+        for pwd in passwords:
+            if not pwd:
+                continue
+            cursor.execute("INSERT OR IGNORE INTO seen (pwd) VALUES (?)", (pwd,))
+            if cursor.rowcount == 1:
+                new_passwords.append(pwd)
+        self._db.commit()
+
+        if new_passwords:
+            self._file.write("\n".join(new_passwords) + "\n")
+            self._file.flush()
+            self.written += len(new_passwords)
+        return len(new_passwords)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self._db:
+            self._db.close()
+            self._db = None
+        if self._db_path and os.path.exists(self._db_path):
+            try:
+                os.remove(self._db_path)
+            except OSError:
+                pass
+        self._db_path = None
+
+
+# 按出现频率合并排序字典（离线工具，使用磁盘SQLite计数）
+class FrequencySorter:
+    def __init__(self, dict_paths, output_path, chunk_size=50000, seven_zip_path="7z.exe"):
+        self.dict_paths = dict_paths
+        self.output_path = output_path
+        self.chunk_size = chunk_size
+        self.seven_zip_path = seven_zip_path  # 解压 .7z 字典
+
+    def run(self, progress_callback=None, stop_check=None):
+        """统计所有字典中每个密码的出现次数，按次数降序写出，返回写出的密码数"""
+        fd, db_path = tempfile.mkstemp(suffix=".freq.db",
+                                       dir=os.path.dirname(os.path.abspath(self.output_path)))
+        os.close(fd)
+        db = sqlite3.connect(db_path)
+        try:
+            db.execute("PRAGMA journal_mode=OFF")
+            db.execute("PRAGMA synchronous=OFF")
+            db.execute("CREATE TABLE counts (pwd TEXT PRIMARY KEY, count INTEGER, first_seen INTEGER)")
+            upsert = ("INSERT INTO counts (pwd, count, first_seen) VALUES (?, 1, ?) "
+                      "ON CONFLICT(pwd) DO UPDATE SET count = count + 1")
+
+            order = 0
+            total_files = len(self.dict_paths)
+            for i, dict_path in enumerate(self.dict_paths, 1):
+                chunk = []
+                for password in iter_dictionary_words(dict_path, self.seven_zip_path):
+                    chunk.append((password, order))
+                    order += 1
+                    if len(chunk) >= self.chunk_size:
+                        db.executemany(upsert, chunk)
+                        chunk = []
+                        if stop_check and stop_check():
+                            return 0
+                db.executemany(upsert, chunk)
+                db.commit()
+                if progress_callback:
+                    progress_callback(i, total_files)
+
+            # 出现次数多的在前，次数相同时保持首次出现顺序
+            written = 0
+            with open(self.output_path, 'w', encoding='utf-8') as out:
+                cursor = db.execute("SELECT pwd FROM counts ORDER BY count DESC, first_seen")
+                while True:
+                    rows = cursor.fetchmany(self.chunk_size)
+                    if not rows:
+                        break
+                    out.write("\n".join(row[0] for row in rows) + "\n")
+                    written += len(rows)
+            return written
+        finally:
+            db.close()
+            try:
+                os.remove(db_path)
+            except OSError:
+                pass
+
+
+# 内置规则（hashcat语法），未指定规则文件时使用
+BUILTIN_RULES = [
+    ":", "l", "u", "c", "C", "t", "r", "d", "f",
+    "$1", "$2", "$3", "$!", "$1$2$3", "$1$2$3$4$5$6", "$8$8$8", "$6$6$6",
+    "^1", "^!", "c$1", "c$!", "c$1$2$3",
+    "sa@", "se3", "si1", "so0", "ss$", "st7", "sa@se3si1so0",
+    "'6", "'8", "[", "]", "{", "}", "q", "E",
+]
+
+
+# 规则变换引擎（兼容hashcat/John规则语法）
+class RuleEngine:
+    # 规则中的位置参数: 0-9 表示 0-9, A-Z 表示 10-35
+    POSITIONS = {c: i for i, c in enumerate(string.digits + string.ascii_uppercase)}
+
+    def __init__(self, rules=None):
+        self.rules = []  # [(规则文本, 编译后的操作列表)]
+        self.generated = []
+        self.hits = []
+        self.lock = Lock()
+        for rule in (rules if rules is not None else BUILTIN_RULES):
+            self.add_rule(rule)
+
+    @classmethod
+    def from_file(cls, file_path):
+        """从规则文件加载（每行一条规则，#开头为注释）"""
+        with codecs.open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return cls([line.rstrip("\r\n") for line in f])
+
+    def __len__(self):
+        return len(self.rules)
+
+    def add_rule(self, text):
+        if not text.strip() or text.lstrip().startswith('#'):
+            return False
+        try:
+            ops = self.compile_rule(text)
+        except ValueError as e:
+            print(f"忽略无效规则 {text!r}: {str(e)}")
+            return False
+        self.rules.append((text, ops))
+        self.generated.append(0)
+        self.hits.append(0)
+        return True
+
+    def _pos(self, rule, i):
+        if i >= len(rule) or rule[i] not in self.POSITIONS:
+            raise ValueError(f"第 {i} 个字符需要位置参数")
+        return self.POSITIONS[rule[i]]
+
+    def _char(self, rule, i):
+        if i >= len(rule):
+            raise ValueError(f"第 {i} 个字符需要字符参数")
+        return rule[i]
+
+    def compile_rule(self, rule):
+        """将一条规则编译为函数列表，函数返回None表示拒绝该候选"""
+        ops = []
+        i = 0
+        while i < len(rule):
+            op = rule[i]
+            i += 1
+            if op in ' \t:':
+                continue
+            elif op == 'l':
+                ops.append(str.lower)
+            elif op == 'u':
+                ops.append(str.upper)
+            elif op == 'c':
+                ops.append(lambda w: w[:1].upper() + w[1:].lower())
+            elif op == 'C':
+                ops.append(lambda w: w[:1].lower() + w[1:].upper())
+            elif op == 't':
+                ops.append(str.swapcase)
+            elif op == 'E':
+                ops.append(lambda w: ' '.join(p[:1].upper() + p[1:] for p in w.lower().split(' ')))
+            elif op == 'r':
+                ops.append(lambda w: w[::-1])
+            elif op == 'd':
+                ops.append(lambda w: w + w)
+            elif op == 'f':
+                ops.append(lambda w: w + w[::-1])
+            elif op == 'q':
+                ops.append(lambda w: ''.join(c + c for c in w))
+            elif op == '{':
+                ops.append(lambda w: w[1:] + w[:1])
+            elif op == '}':
+                ops.append(lambda w: w[-1:] + w[:-1])
+            elif op == '[':
+                ops.append(lambda w: w[1:])
+            elif op == ']':
+                ops.append(lambda w: w[:-1])
+            elif op == 'k':
+                ops.append(lambda w: w[1:2] + w[:1] + w[2:])
+            elif op == 'K':
+                ops.append(lambda w: w[:-2] + w[-1:] + w[-2:-1] if len(w) >= 2 else w)
+            elif op == '$':
+                x = self._char(rule, i); i += 1
+                ops.append(lambda w, x=x: w + x)
+            elif op == '^':
+                x = self._char(rule, i); i += 1
+                ops.append(lambda w, x=x: x + w)
+            elif op == '@':
+                x = self._char(rule, i); i += 1
+                ops.append(lambda w, x=x: w.replace(x, ''))
+            elif op == 's':
+                x = self._char(rule, i); y = self._char(rule, i + 1); i += 2
+                ops.append(lambda w, x=x, y=y: w.replace(x, y))
+            elif op == 'T':
+                n = self._pos(rule, i); i += 1
+                ops.append(lambda w, n=n: w[:n] + w[n].swapcase() + w[n + 1:] if n < len(w) else w)
+            elif op == 'p':
+                n = self._pos(rule, i); i += 1
+                ops.append(lambda w, n=n: w * (n + 1))
+            elif op == 'D':
+                n = self._pos(rule, i); i += 1
+                ops.append(lambda w, n=n: w[:n] + w[n + 1:])
+            elif op == "'":
+                n = self._pos(rule, i); i += 1
+                ops.append(lambda w, n=n: w[:n])
+            elif op == 'z':
+                n = self._pos(rule, i); i += 1
+                ops.append(lambda w, n=n: w[:1] * n + w)
+            elif op == 'Z':
+                n = self._pos(rule, i); i += 1
+                ops.append(lambda w, n=n: w + w[-1:] * n)
+            elif op == 'x':
+                n = self._pos(rule, i); m = self._pos(rule, i + 1); i += 2
+                ops.append(lambda w, n=n, m=m: w[n:n + m])
+            elif op == 'O':
+                n = self._pos(rule, i); m = self._pos(rule, i + 1); i += 2
+                ops.append(lambda w, n=n, m=m: w[:n] + w[n + m:])
+            elif op == 'i':
+                n = self._pos(rule, i); x = self._char(rule, i + 1); i += 2
+                ops.append(lambda w, n=n, x=x: w[:n] + x + w[n:] if n <= len(w) else w)
+            elif op == 'o':
+                n = self._pos(rule, i); x = self._char(rule, i + 1); i += 2
+                ops.append(lambda w, n=n, x=x: w[:n] + x + w[n + 1:] if n < len(w) else w)
+            elif op == '<':
+                n = self._pos(rule, i); i += 1
+                ops.append(lambda w, n=n: w if len(w) < n else None)
+            elif op == '>':
+                n = self._pos(rule, i); i += 1
+                ops.append(lambda w, n=n: w if len(w) > n else None)
+            elif op == '!':
+                x = self._char(rule, i); i += 1
+                ops.append(lambda w, x=x: None if x in w else w)
+            elif op == '/':
+                x = self._char(rule, i); i += 1
+                ops.append(lambda w, x=x: w if x in w else None)
+            else:
+                raise ValueError(f"不支持的规则函数 '{op}'")
+        return ops
+
+    def apply_word(self, word):
+        """对单个单词依次应用所有规则，生成 (候选密码, 规则序号)"""
+        seen = set()
+        generated = []
+        for index, (_, ops) in enumerate(self.rules):
+            candidate = word
+            for op in ops:
+                candidate = op(candidate)
+                if candidate is None:
+                    break
+            if not candidate or candidate in seen:
+                continue
+            seen.add(candidate)
+            generated.append(index)
+            yield candidate, index
+        with self.lock:
+            for index in generated:
+                self.generated[index] += 1
+
+    def expand(self, words):
+        """惰性地对字典流应用规则，不在磁盘上展开"""
+        for word in words:
+            yield from self.apply_word(word)
+
+    def record_hit(self, index):
+        with self.lock:
+            self.hits[index] += 1
+
+    def stats(self):
+        """返回每条规则的统计: [(规则, 生成数, 命中数)]"""
+        with self.lock:
+            return [(text, self.generated[i], self.hits[i])
+                    for i, (text, _) in enumerate(self.rules)]
+
+
+# 掩码内置字符集（hashcat语法）
+MASK_CHARSETS = {
+    'l': string.ascii_lowercase,
+    'u': string.ascii_uppercase,
+    'd': string.digits,
+    's': ' ' + string.punctuation,
+    'a': string.ascii_lowercase + string.ascii_uppercase + string.digits + ' ' + string.punctuation,
+    'h': '0123456789abcdef',
+    'H': '0123456789ABCDEF',
+}
+
+
+# 掩码/暴力破解候选生成器，支持 O(1) 序号→候选映射
+def generator_resume_key(*parts):
+    """由生成器的全部定义计算恢复点的键"""
+    return hashlib.sha1(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class MaskGenerator:
+    def __init__(self, mask, custom_charsets=None, min_length=None, max_length=None):
+        self.mask = mask
+        self.name = mask
+        self.custom_charsets = {}
+        for key, value in (custom_charsets or {}).items():
+            if value:
+                self.custom_charsets[str(key)] = self.expand_charset(value)
+        self.positions = self.parse_mask(mask)
+        if not self.positions:
+            raise ValueError("掩码为空")
+
+        # 增量模式：依次尝试掩码的前 min_length..max_length 位
+        max_length = min(max_length or len(self.positions), len(self.positions))
+        min_length = max(1, min(min_length or max_length, max_length))
+        self.segments = []  # [(长度, 起始序号, 该长度的候选数)]
+        self.keyspace = 0
+        for length in range(min_length, max_length + 1):
+            size = 1
+            for charset in self.positions[:length]:
+                size *= len(charset)
+            self.segments.append((length, self.keyspace, size))
+            self.keyspace += size
+        # 恢复点的键：掩码相同但自定义字符集或增量长度不同时，同一序号对应的是不同的候选
+        self.resume_key = generator_resume_key(
+            "mask", mask, sorted(self.custom_charsets.items()), min_length, max_length)
+
+    def expand_charset(self, text):
+        """展开字符集定义中的 ?l ?d 等引用，去重并保持顺序"""
+        chars = []
+        i = 0
+        while i < len(text):
+            if text[i] == '?' and i + 1 < len(text):
+                key = text[i + 1]
+                if key == '?':
+                    chars.append('?')
+                elif key in MASK_CHARSETS:
+                    chars.extend(MASK_CHARSETS[key])
+                else:
+                    raise ValueError(f"未知字符集 ?{key}")
+                i += 2
+            else:
+                chars.append(text[i])
+                i += 1
+        return ''.join(dict.fromkeys(chars))
+
+    def parse_mask(self, mask):
+        positions = []
+        i = 0
+        while i < len(mask):
+            if mask[i] == '?' and i + 1 < len(mask):
+                key = mask[i + 1]
+                if key == '?':
+                    positions.append('?')
+                elif key in MASK_CHARSETS:
+                    positions.append(MASK_CHARSETS[key])
+                elif key in self.custom_charsets:
+                    positions.append(self.custom_charsets[key])
+                else:
+                    raise ValueError(f"未定义的字符集 ?{key}")
+                i += 2
+            else:
+                positions.append(mask[i])
+                i += 1
+        return positions
+
+    def __len__(self):
+        return self.keyspace
+
+    def _locate(self, index):
+        """返回序号所在的 (长度, 段内序号, 段大小)"""
+        if index < 0 or index >= self.keyspace:
+            raise IndexError(index)
+        for length, start, size in self.segments:
+            if index < start + size:
+                return length, index - start, size
+        raise IndexError(index)
+
+    def _digits(self, length, local_index):
+        digits = [0] * length
+        for pos in range(length - 1, -1, -1):
+            local_index, digits[pos] = divmod(local_index, len(self.positions[pos]))
+        return digits
+
+    def candidate(self, index):
+        """按序号直接计算候选密码（最右位变化最快）"""
+        length, local_index, _ = self._locate(index)
+        digits = self._digits(length, local_index)
+        return ''.join(self.positions[pos][d] for pos, d in enumerate(digits))
+
+    def iter_range(self, start=0, end=None):
+        """生成 [start, end) 范围内的 (序号, 候选密码)"""
+        end = self.keyspace if end is None else min(end, self.keyspace)
+        index = start
+        while index < end:
+            length, local_index, size = self._locate(index)
+            segment_end = min(end, index - local_index + size)
+            charsets = self.positions[:length]
+            digits = self._digits(length, local_index)
+            chars = [charsets[pos][d] for pos, d in enumerate(digits)]
+            while index < segment_end:
+                yield index, ''.join(chars)
+                index += 1
+                # 里程表式进位
+                pos = length - 1
+                while pos >= 0:
+                    digits[pos] += 1
+                    if digits[pos] < len(charsets[pos]):
+                        chars[pos] = charsets[pos][digits[pos]]
+                        break
+                    digits[pos] = 0
+                    chars[pos] = charsets[pos][0]
+                    pos -= 1
+
+
+# 一批候选密码：所有行连续存放在一个字节缓冲区，array 记录每行的结束偏移，
+# origin 为第一行在字典中的位置 (行号, 字节偏移)，验证时才逐个解码
+class CandidateBatch:
+    __slots__ = ("buffer", "ends", "origin")
+
+    def __init__(self, origin):
+        self.buffer = bytearray()
+        self.ends = array('I')
+        self.origin = origin
+
+    def __len__(self):
+        return len(self.ends)
+
+    def append(self, data):
+        self.buffer += data
+        self.ends.append(len(self.buffer))
+
+    def decode(self, k, encoding):
+        """第 k 行解码并去掉首尾空白"""
+        start = self.ends[k - 1] if k else 0
+        return self.buffer[start:self.ends[k]].decode(encoding, errors='ignore').strip()
+
+
+# 流式读取的单词列表（不整体载入内存）
+class WordListSource:
+    INDEX_STEP = 4096  # 稀疏索引：每隔多少个单词记录一次字节偏移
+
+    def __init__(self, path):
+        # 创建时不读文件（在界面线程中创建），编码检测和计数在破解线程第一次使用时进行
+        self.path = path
+        self._count = None
+        self._encoding = None
+        self._index = [0]  # 第 k*INDEX_STEP 个单词的字节偏移
+        self._lock = Lock()  # 多个压缩文件的破解线程共享同一个生成器
+
+    @property
+    def encoding(self):
+        with self._lock:
+            if self._encoding is None:
+                encoding = detect_dictionary_encoding(self.path)
+                self._encoding = 'utf-8' if encoding == 'utf-8-sig' else encoding
+            return self._encoding
+
+    def __len__(self):
+        with self._lock:
+            if self._count is None:
+                self._scan()
+            return self._count
+
+    def _scan(self):
+        """首次遍历时统计单词数，同时建立 单词序号→字节偏移 的稀疏索引"""
+        count = 0
+        offset = 0
+        index = [0]
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                if raw.strip():
+                    count += 1
+                    if count % self.INDEX_STEP == 0:
+                        index.append(offset + len(raw))
+                offset += len(raw)
+        self._index = index
+        self._count = count
+
+    def iter_words(self, start=0):
+        """依次生成非空单词，跳过前 start 个（借助稀疏索引直接定位）"""
+        encoding = self.encoding
+        slot = min(start // self.INDEX_STEP, len(self._index) - 1)
+        index = slot * self.INDEX_STEP
+        with open(self.path, 'rb') as f:
+            f.seek(self._index[slot])
+            for raw in f:
+                raw = raw.strip()
+                if not raw:
+                    continue
+                if index >= start:
+                    yield raw.decode(encoding, errors='ignore').lstrip('\ufeff')
+                index += 1
+
+
+# 混合攻击生成器：字典+掩码 或 掩码+字典
+class HybridGenerator:
+    def __init__(self, word_list, mask_generator, mask_first=False):
+        self.word_list = word_list
+        self.mask_generator = mask_generator
+        self.mask_first = mask_first
+        word_name = os.path.basename(word_list.path)
+        self.name = (f"{mask_generator.mask}+{word_name}" if mask_first
+                     else f"{word_name}+{mask_generator.mask}")
+        self.resume_key = generator_resume_key(
+            "hybrid", mask_generator.resume_key, os.path.abspath(word_list.path), mask_first)
+
+    @property
+    def keyspace(self):
+        """第一次使用时才统计字典单词数"""
+        return len(self.word_list) * self.mask_generator.keyspace
+
+    def __len__(self):
+        return self.keyspace
+
+    def iter_range(self, start=0, end=None):
+        """生成 [start, end) 范围内的 (序号, 候选密码)，序号 = 单词序号 × 掩码候选数 + 掩码序号"""
+        end = self.keyspace if end is None else min(end, self.keyspace)
+        if start >= end:
+            return
+        mask_keyspace = self.mask_generator.keyspace
+        word_index, mask_index = divmod(start, mask_keyspace)
+        index = start
+        for word in self.word_list.iter_words(word_index):
+            mask_end = min(mask_keyspace, mask_index + end - index)
+            for _, suffix in self.mask_generator.iter_range(mask_index, mask_end):
+                yield index, (suffix + word if self.mask_first else word + suffix)
+                index += 1
+            if index >= end:
+                return
+            mask_index = 0
+
+
+# 组合攻击生成器：左字典单词 + 右字典单词
+class CombinatorGenerator:
+    def __init__(self, left_list, right_list):
+        self.left_list = left_list
+        self.right_list = right_list
+        self.name = f"{os.path.basename(left_list.path)}+{os.path.basename(right_list.path)}"
+        self.resume_key = generator_resume_key(
+            "combinator", os.path.abspath(left_list.path), os.path.abspath(right_list.path))
+
+    @property
+    def keyspace(self):
+        """第一次使用时才统计两个字典的单词数"""
+        return len(self.left_list) * len(self.right_list)
+
+    def __len__(self):
+        return self.keyspace
+
+    def iter_range(self, start=0, end=None):
+        """生成 [start, end) 范围内的 (序号, 候选密码)，右字典对每个左单词重新流式读取"""
+        end = self.keyspace if end is None else min(end, self.keyspace)
+        if start >= end:
+            return
+        right_count = len(self.right_list)
+        left_index, right_index = divmod(start, right_count)
+        index = start
+        for left in self.left_list.iter_words(left_index):
+            for right in self.right_list.iter_words(right_index):
+                yield index, left + right
+                index += 1
+                if index >= end:
+                    return
+            right_index = 0
+
+
+# 检查点日志：追加写入的JSON行，定期落盘，崩溃后可精确恢复
+class CheckpointJournal:
+    def __init__(self, path, flush_interval=5.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.lock = Lock()
+        self.pending = {}  # (压缩文件, 键) -> 恢复点
+        self.last_flush = time.time()
+
+    def exists(self):
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def update(self, archive_path, key, entry):
+        """记录恢复点（只保留最新值），距上次落盘超过间隔时写入磁盘"""
+        with self.lock:
+            self.pending[(archive_path, key)] = dict(entry)
+            due = time.time() - self.last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush_if_due(self):
+        if time.time() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self.pending:
+                return
+            try:
+                torn = self._has_torn_tail()
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    if torn:
+                        f.write("\n")  # 上次崩溃留下半行，从新行开始
+                    for (archive_path, key), entry in self.pending.items():
+                        record = {"archive": archive_path, "key": key, "entry": entry}
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.pending.clear()
+            except Exception as e:
+                print(f"写入检查点日志失败: {str(e)}")
+            self.last_flush = time.time()
+
+    def _has_torn_tail(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return False
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def mark_solved(self, archive_path):
+        """压缩文件已破解，后续恢复时不再处理"""
+        self.mark_solved_many([archive_path])
+
+    def mark_solved_many(self, archive_paths):
+        """批量标记已破解，只落盘一次"""
+        archive_paths = set(archive_paths)
+        with self.lock:
+            for key in [k for k in self.pending if k[0] in archive_paths]:
+                del self.pending[key]
+            for archive_path in archive_paths:
+                self.pending[(archive_path, None)] = {"solved": True}
+        self.flush()
+
+    def write_config(self, config):
+        """新任务开始时写入任务配置（有序字典列表、生成器设置等），作为日志的第一条记录"""
+        with self.lock:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"config": config}, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            except Exception as e:
+                print(f"写入检查点日志失败: {str(e)}")
+
+    def load_config(self):
+        """返回任务配置，旧日志没有配置记录时返回None"""
+        return self._replay()[0]
+
+    def load(self):
+        """重放日志，返回 {压缩文件: {键: 恢复点}}，已破解的压缩文件值为None
+
+        忽略崩溃时写了一半的行
+        """
+        return self._replay()[1]
+
+    def _replay(self):
+        self.flush()
+        config = None
+        state = {}
+        if not os.path.exists(self.path):
+            return config, state
+        with open(self.path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if "config" in record:
+                    config = record["config"]
+                    continue
+                archive_path = record.get("archive")
+                if record.get("key") is None:
+                    state[archive_path] = None
+                    continue
+                if state.get(archive_path) is None:
+                    state[archive_path] = {}
+                state[archive_path][record["key"]] = record["entry"]
+        return config, state
+
+    def compact(self):
+        """将日志压缩为每个恢复点一条记录（任务配置仍在第一条）"""
+        config, state = self._replay()
+        tmp_path = self.path + ".tmp"
+        with self.lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                if config is not None:
+                    f.write(json.dumps({"config": config}, ensure_ascii=False) + "\n")
+                for archive_path, entries in state.items():
+                    if entries is None:
+                        entries = {None: {"solved": True}}
+                    for key, entry in entries.items():
+                        record = {"archive": archive_path, "key": key, "entry": entry}
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def reset(self):
+        with self.lock:
+            self.pending.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def merge_resume_info(resume_data, journal_state):
+    """把检查点日志的恢复点合并进恢复信息
+
+    任务中每个未解决的压缩文件都要恢复，包括还在调度器中排队、崩溃前没写过检查点的
+    """
+    resume_info = resume_data.setdefault("resume_info", {})
+    if "archive_paths" in resume_data:
+        archive_paths = resume_data["archive_paths"]
+    else:
+        archive_paths = [item["path"] for item in resume_data.get("archive_items", [])
+                         if item.get("checked", True) and not item.get("solved")]
+    for archive_path in archive_paths:
+        resume_info.setdefault(archive_path, {})
+    for archive_path, entries in journal_state.items():
+        if entries is None:
+            resume_info.pop(archive_path, None)  # 已破解
+        else:
+            resume_info.setdefault(archive_path, {}).update(entries)
+    return resume_data
+
+
+# 压缩文件元数据缓存：(路径, 大小, 修改时间) -> 元数据
+_archive_metadata_cache = {}
+_archive_metadata_lock = Lock()
+
+
+def _read_7z_number(data, pos):
+    """读取7z头部的变长整数，返回 (值, 新位置)"""
+    first = data[pos]
+    pos += 1
+    mask = 0x80
+    value = 0
+    for i in range(8):
+        if not first & mask:
+            return value | ((first & (mask - 1)) << (8 * i)), pos
+        value |= data[pos] << (8 * i)
+        pos += 1
+        mask >>= 1
+    return value, pos
+
+
+def _skip_7z_digests(data, pos, count):
+    """跳过7z头部中的CRC列表"""
+    all_defined = data[pos]
+    pos += 1
+    if all_defined:
+        defined = count
+    else:
+        bits = data[pos:pos + (count + 7) // 8]
+        pos += (count + 7) // 8
+        defined = sum(bin(b).count("1") for b in bits)
+    return pos + 4 * defined
+
+
+def _parse_7z_streams_info(data, pos):
+    """解析7z StreamsInfo，返回 (打包位置, 打包大小列表, 文件夹列表, 是否完整)
+
+    每个文件夹是编码器列表 [(编码器ID十六进制, 属性字节)]，解压大小等后续内容不需要；
+    遇到不认识的结构时提前返回，完整标志为False，文件夹列表不可信
+    """
+    pack_pos, pack_sizes, folders = 0, [], []
+    while pos < len(data):
+        prop = data[pos]
+        pos += 1
+        if prop == 0x00:  # kEnd
+            return pack_pos, pack_sizes, folders, True
+        if prop == 0x06:  # kPackInfo
+            pack_pos, pos = _read_7z_number(data, pos)
+            num_pack, pos = _read_7z_number(data, pos)
+            while data[pos] != 0x00:
+                sub = data[pos]
+                pos += 1
+                if sub == 0x09:  # kSize
+                    for _ in range(num_pack):
+                        size, pos = _read_7z_number(data, pos)
+                        pack_sizes.append(size)
+                elif sub == 0x0A:  # kCRC
+                    pos = _skip_7z_digests(data, pos, num_pack)
+                else:
+                    return pack_pos, pack_sizes, folders, False
+            pos += 1
+        elif prop == 0x07:  # kUnpackInfo
+            if data[pos] != 0x0B:  # kFolder
+                return pack_pos, pack_sizes, folders, False
+            num_folders, pos = _read_7z_number(data, pos + 1)
+            if data[pos] != 0:  # 外部数据，不支持
+                return pack_pos, pack_sizes, folders, False
+            pos += 1
+            for _ in range(num_folders):
+                coders = []
+                num_coders, pos = _read_7z_number(data, pos)
+                total_in = total_out = 0
+                for _ in range(num_coders):
+                    flag = data[pos]
+                    pos += 1
+                    coder_id = data[pos:pos + (flag & 0x0F)].hex()
+                    pos += flag & 0x0F
+                    num_in = num_out = 1
+                    if flag & 0x10:
+                        num_in, pos = _read_7z_number(data, pos)
+                        num_out, pos = _read_7z_number(data, pos)
+                    total_in += num_in
+                    total_out += num_out
+                    props = b""
+                    if flag & 0x20:
+                        size, pos = _read_7z_number(data, pos)
+                        props = data[pos:pos + size]
+                        pos += size
+                    coders.append((coder_id, props))
+                for _ in range(total_out - 1):  # 绑定对
+                    _, pos = _read_7z_number(data, pos)
+                    _, pos = _read_7z_number(data, pos)
+                num_packed = total_in - (total_out - 1)
+                if num_packed > 1:
+                    for _ in range(num_packed):
+                        _, pos = _read_7z_number(data, pos)
+                folders.append(coders)
+            # 全部文件夹的编码器都已读出，后面的解压大小等不需要
+            return pack_pos, pack_sizes, folders, True
+        else:
+            return pack_pos, pack_sizes, folders, False
+    return pack_pos, pack_sizes, folders, False
+
+
+def _apply_7z_aes_props(metadata, props):
+    """从7zAES编码器属性中读取迭代次数和盐"""
+    cycles = props[0] & 0x3F if props else 19
+    salt = b""
+    if props and props[0] & 0xC0:
+        salt_size = ((props[0] >> 7) & 1) + (props[1] >> 4)
+        salt = props[2:2 + salt_size]
+    metadata["encryption"] = "7zAES"
+    metadata["kdf"] = f"SHA256 2^{cycles}次"
+    metadata["salt"] = salt.hex() or None
+
+
+def _decompress_7z_header(coders, packed):
+    """解压仅被LZMA/LZMA2压缩（未加密）的7z头部"""
+    if len(coders) != 1:
+        return None
+    coder_id, props = coders[0]
+    if coder_id == "030101" and len(props) >= 5:
+        lc_lp_pb = props[0]
+        dict_size = struct.unpack_from("<I", props, 1)[0]
+        filters = [{"id": lzma.FILTER_LZMA1, "dict_size": max(dict_size, 4096),
+                    "lc": lc_lp_pb % 9, "lp": (lc_lp_pb // 9) % 5, "pb": lc_lp_pb // 45}]
+    elif coder_id == "21" and props:
+        bits = props[0]
+        dict_size = 0xFFFFFFFF if bits >= 40 else (2 | (bits & 1)) << (bits // 2 + 11)
+        filters = [{"id": lzma.FILTER_LZMA2, "dict_size": max(dict_size, 4096)}]
+    else:
+        return None
+    return lzma.LZMADecompressor(lzma.FORMAT_RAW, filters=filters).decompress(packed)
+
+
+def _scan_7z(f, metadata):
+    signature = f.read(32)
+    next_offset, next_size = struct.unpack_from("<QQ", signature, 12)
+    f.seek(32 + next_offset)
+    header = f.read(next_size)
+    if not header:
+        return
+    if header[0] == 0x17:  # kEncodedHeader
+        pack_pos, pack_sizes, folders, _ = _parse_7z_streams_info(header, 1)
+        coders = folders[0] if folders else []
+        for coder_id, props in coders:
+            if coder_id == "06f10701":
+                metadata["header_encrypted"] = True
+                _apply_7z_aes_props(metadata, props)
+                return
+        if not pack_sizes:
+            return
+        f.seek(32 + pack_pos)
+        header = _decompress_7z_header(coders, f.read(pack_sizes[0]))
+        if not header:
+            return
+    if header[0] == 0x01 and len(header) > 1 and header[1] == 0x04:  # kHeader, kMainStreamsInfo
+        _, _, folders, complete = _parse_7z_streams_info(header, 2)
+        for coders in folders:
+            for coder_id, props in coders:
+                if coder_id == "06f10701":
+                    _apply_7z_aes_props(metadata, props)
+                    return
+        # 只有完整解析了所有文件夹才能断定无加密，否则保持未知，照常破解
+        if complete:
+            metadata["encryption"] = "none"
+
+
+def _read_rar5_vint(data, pos):
+    value = shift = 0
+    while pos < len(data):
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            break
+    return value, pos
+
+
+def _scan_rar(f, metadata):
+    if metadata["format"] == "rar5":
+        f.seek(8)
+        block = f.read(64)
+        _, pos = _read_rar5_vint(block, 4)  # 跳过CRC32，读取头大小
+        header_type, pos = _read_rar5_vint(block, pos)
+        if header_type != 4:  # 归档加密头
+            return
+        header_flags, pos = _read_rar5_vint(block, pos)
+        if header_flags & 0x01:
+            _, pos = _read_rar5_vint(block, pos)
+        if header_flags & 0x02:
+            _, pos = _read_rar5_vint(block, pos)
+        _, pos = _read_rar5_vint(block, pos)  # 加密版本
+        _, pos = _read_rar5_vint(block, pos)  # 加密标志
+        metadata["header_encrypted"] = True
+        metadata["encryption"] = "rar5-aes"
+        metadata["kdf"] = f"PBKDF2-HMAC-SHA256 2^{block[pos]}次"
+        metadata["salt"] = block[pos + 1:pos + 17].hex()
+    else:
+        f.seek(7)
+        block = f.read(7)
+        if len(block) == 7 and block[2] == 0x73 and struct.unpack_from("<H", block, 3)[0] & 0x0080:
+            metadata["header_encrypted"] = True
+            metadata["encryption"] = "rar4-aes"
+            metadata["kdf"] = "SHA1 2^18次"
+
+
+# 旧版ZIP（ZipCrypto）密码按系统OEM代码页编码，中文Windows为GBK
+LEGACY_ZIP_PASSWORD_ENCODING = 'gbk'
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def encode_password(password, encoding):
+    """按编码转换密码，无法编码时返回None；结果在使用同一编码的压缩文件之间共享"""
+    try:
+        return password.encode(encoding)
+    except UnicodeEncodeError:
+        return None
+
+
+def password_variants(password, encodings):
+    """压缩文件可能使用的密码字节形式（去重，按可能性排序）"""
+    variants = []
+    for encoding in encodings:
+        data = encode_password(password, encoding)
+        if data is not None and data not in variants:
+            variants.append(data)
+    return variants
+
+
+def _crc32_table():
+    table = []
+    for i in range(256):
+        c = i
+        for _ in range(8):
+            c = (c >> 1) ^ 0xEDB88320 if c & 1 else c >> 1
+        table.append(c)
+    return table
+
+
+_CRC32_TABLE = _crc32_table()
+
+
+# ZipCrypto 校验字节过滤：用多个条目的12字节加密头同时检查（各条目共用同一密码），
+# 错误密码通过的概率约为 1/256^k，只有通过的候选才做完整的解压/CRC验证
+class ZipCryptoCheck:
+    MAX_ENTRIES = 8
+
+    def __init__(self, headers):
+        self.headers = headers  # [(12字节加密头, 校验字节)]
+
+    @classmethod
+    def from_metadata(cls, metadata):
+        """元数据中没有校验信息（非ZipCrypto）时返回None"""
+        if not metadata or not metadata.get("check_headers"):
+            return None
+        return cls([(bytes.fromhex(header), check) for header, check in metadata["check_headers"]])
+
+    def matches(self, pwd):
+        table = _CRC32_TABLE
+        k0, k1, k2 = 0x12345678, 0x23456789, 0x34567890
+        for c in pwd:
+            k0 = (k0 >> 8) ^ table[(k0 ^ c) & 0xFF]
+            k1 = ((k1 + (k0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+            k2 = (k2 >> 8) ^ table[(k2 ^ (k1 >> 24)) & 0xFF]
+        for header, check in self.headers:
+            a, b, d = k0, k1, k2
+            for c in header:
+                t = d | 2
+                c ^= ((t * (t ^ 1)) >> 8) & 0xFF
+                a = (a >> 8) ^ table[(a ^ c) & 0xFF]
+                b = ((b + (a & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+                d = (d >> 8) ^ table[(d ^ (b >> 24)) & 0xFF]
+            if c != check:
+                return False
+        return True
+
+    def rejects(self, password, encodings):
+        """密码的所有字节形式都通不过校验时返回True"""
+        return not any(self.matches(pwd) for pwd in password_variants(password, encodings))
+
+
+def _zipcrypto_check_byte(info):
+    # 校验字节：有数据描述符时取修改时间高字节，否则取CRC高字节
+    if info.flag_bits & 0x8:
+        hour, minute = info.date_time[3], info.date_time[4]
+        return ((hour << 3) | (minute >> 3)) & 0xFF
+    return (info.CRC >> 24) & 0xFF
+
+
+def _scan_zip(archive_path, metadata):
+    with zipfile.ZipFile(archive_path) as zf:
+        infos = [info for info in zf.infolist() if not info.is_dir()]
+    encrypted = [info for info in infos if info.flag_bits & 0x1]
+    metadata["entries"] = len(infos)
+    metadata["encrypted_entries"] = len(encrypted)
+    if not encrypted:
+        metadata["encryption"] = "none"
+        return
+    # 空条目没有数据可供CRC校验，错误密码也可能通过，只从非空条目中选
+    nonempty = [info for info in encrypted if info.file_size > 0]
+    if nonempty:
+        smallest = min(nonempty, key=lambda info: info.compress_size)
+        metadata["smallest_entry"] = smallest.filename
+    else:
+        smallest = encrypted[0]  # 只用于识别加密方式，验证时测试整个压缩文件
+    if smallest.compress_type == 99:  # WinZip AES
+        metadata["encryption"] = "aes"
+        strength = 3
+        extra = smallest.extra
+        pos = 0
+        while pos + 4 <= len(extra):
+            header_id, size = struct.unpack_from("<HH", extra, pos)
+            if header_id == 0x9901 and size >= 7:
+                strength = extra[pos + 8]
+            pos += 4 + size
+        salt_size = {1: 8, 2: 12, 3: 16}.get(strength, 16)
+        with open(archive_path, 'rb') as f:
+            f.seek(smallest.header_offset)
+            local_header = f.read(30)
+            name_length, extra_length = struct.unpack_from("<HH", local_header, 26)
+            f.seek(smallest.header_offset + 30 + name_length + extra_length)
+            metadata["salt"] = f.read(salt_size).hex()
+        metadata["kdf"] = f"PBKDF2-HMAC-SHA1 1000次, AES-{64 + 64 * strength}"
+        metadata["password_encodings"] = ['utf-8']
+    else:
+        metadata["encryption"] = "zipcrypto"
+        # 旧版ZIP用系统代码页编码密码，设置了UTF-8标志（第11位）的多为UTF-8
+        if smallest.flag_bits & 0x800:
+            metadata["password_encodings"] = ['utf-8', LEGACY_ZIP_PASSWORD_ENCODING]
+        else:
+            metadata["password_encodings"] = [LEGACY_ZIP_PASSWORD_ENCODING, 'utf-8']
+        metadata["check_byte"] = _zipcrypto_check_byte(smallest)
+        metadata["compress_types"] = sorted({info.compress_type for info in encrypted})
+        # 记录多个条目的加密头，用于多条目校验字节过滤
+        check_headers = []
+        with open(archive_path, 'rb') as f:
+            candidates = nonempty + [info for info in encrypted if info.file_size == 0]
+            for info in [info for info in candidates if info.compress_type != 99][:ZipCryptoCheck.MAX_ENTRIES]:
+                f.seek(info.header_offset)
+                local_header = f.read(30)
+                name_length, extra_length = struct.unpack_from("<HH", local_header, 26)
+                f.seek(info.header_offset + 30 + name_length + extra_length)
+                header = f.read(12)
+                if len(header) == 12:
+                    check_headers.append([header.hex(), _zipcrypto_check_byte(info)])
+        metadata["check_headers"] = check_headers
+
+
+def _scan_with_7z_listing(archive_path, seven_zip_path, metadata):
+    """用 7z l -slt 补充条目信息（RAR、头部未加密的7z等）"""
+    try:
+        result = subprocess.run([seven_zip_path, 'l', '-slt', '-p', archive_path],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                stdin=subprocess.DEVNULL, timeout=60)
+    except Exception:
+        return
+    output = result.stdout.decode('utf-8', errors='ignore')
+    if result.returncode != 0:
+        errors = output + result.stderr.decode('utf-8', errors='ignore')
+        if "Wrong password" in errors or "encrypted archive" in errors:
+            metadata["header_encrypted"] = True
+        return
+
+    entries = []
+    current = {}
+    started = False
+    for line in output.splitlines():
+        if line.startswith("----------"):
+            started = True
+            continue
+        if not started:
+            continue
+        if not line.strip():
+            if current:
+                entries.append(current)
+                current = {}
+            continue
+        key, sep, value = line.partition(" = ")
+        if sep:
+            current[key.strip()] = value.strip()
+    if current:
+        entries.append(current)
+
+    files = [entry for entry in entries
+             if "Path" in entry and entry.get("Folder") != "+" and not entry.get("Attributes", "").startswith("D")]
+    encrypted = [entry for entry in files if entry.get("Encrypted") == "+"]
+    metadata["entries"] = len(files)
+    metadata["encrypted_entries"] = len(encrypted)
+    if not encrypted:
+        metadata["encryption"] = "none"
+        return
+    # 空条目没有数据可供CRC校验，只从非空条目中选；都为空时测试整个压缩文件
+    nonempty = [entry for entry in encrypted if int(entry.get("Size") or 0) > 0]
+    if nonempty:
+        smallest = min(nonempty, key=lambda entry: int(entry.get("Packed Size") or entry.get("Size") or 0))
+        metadata["smallest_entry"] = smallest["Path"]
+    else:
+        smallest = encrypted[0]
+    if metadata["encryption"] in ("unknown", "none"):
+        method = smallest.get("Method", "")
+        metadata["encryption"] = next((token for token in method.split()
+                                       if "AES" in token or "ZipCrypto" in token), "encrypted")
+
+
+def scan_archive_metadata(archive_path, seven_zip_path=None):
+    """解析压缩文件一次并缓存（按路径+大小+修改时间）
+
+    返回 {"format", "encryption", "header_encrypted", "entries", "encrypted_entries",
+          "smallest_entry", "salt", "kdf", "check_byte", "check_headers", "password_encodings"}，
+    无法识别的字段为None/"unknown"
+    """
+    try:
+        stat = os.stat(archive_path)
+    except OSError:
+        return None
+    key = (os.path.abspath(archive_path), stat.st_size, stat.st_mtime)
+    with _archive_metadata_lock:
+        if key in _archive_metadata_cache:
+            return _archive_metadata_cache[key]
+
+    metadata = {
+        "format": "unknown",
+        "encryption": "unknown",
+        "header_encrypted": False,
+        "entries": None,
+        "encrypted_entries": None,
+        "smallest_entry": None,
+        "salt": None,
+        "kdf": None,
+        "check_byte": None,
+        "check_headers": None,
+        "password_encodings": None
+    }
+    try:
+        with open(archive_path, 'rb') as f:
+            head = f.read(8)
+            f.seek(0)
+            if head.startswith(b"7z\xbc\xaf\x27\x1c"):
+                metadata["format"] = "7z"
+                _scan_7z(f, metadata)
+            elif head.startswith(b"Rar!\x1a\x07\x01\x00"):
+                metadata["format"] = "rar5"
+                _scan_rar(f, metadata)
+            elif head.startswith(b"Rar!\x1a\x07\x00"):
+                metadata["format"] = "rar4"
+                _scan_rar(f, metadata)
+            elif head.startswith(b"PK"):
+                metadata["format"] = "zip"
+        if metadata["format"] == "zip":
+            _scan_zip(archive_path, metadata)
+    except Exception as e:
+        print(f"解析压缩文件头失败 {archive_path}: {str(e)}")
+
+    # 原生解析得不到条目信息时用7z列表补充
+    if (metadata["entries"] is None and not metadata["header_encrypted"]
+            and seven_zip_path and os.path.exists(seven_zip_path)):
+        _scan_with_7z_listing(archive_path, seven_zip_path, metadata)
+
+    if metadata["password_encodings"] is None:
+        # 7z 与 RAR 的密钥由 UTF-16LE 密码派生
+        metadata["password_encodings"] = (['utf-16-le'] if metadata["format"] in ("7z", "rar4", "rar5")
+                                          else ['utf-8'])
+
+    with _archive_metadata_lock:
+        _archive_metadata_cache[key] = metadata
+    return metadata
+
+
+def describe_archive_metadata(metadata):
+    """元数据的单行描述，用于列表和日志"""
+    if not metadata:
+        return "无法读取"
+    parts = [metadata["format"], metadata["encryption"]]
+    if metadata["header_encrypted"]:
+        parts.append("头部加密")
+    if metadata["kdf"]:
+        parts.append(metadata["kdf"])
+    if metadata["encrypted_entries"] is not None:
+        parts.append(f"加密条目 {metadata['encrypted_entries']}/{metadata['entries']}")
+    if metadata["smallest_entry"]:
+        parts.append(f"最小条目 {metadata['smallest_entry']}")
+    if metadata.get("check_headers"):
+        parts.append(f"校验字节 {len(metadata['check_headers'])} 个条目")
+    if metadata.get("password_encodings"):
+        parts.append(f"密码编码 {'/'.join(metadata['password_encodings'])}")
+    return ", ".join(parts)
+
+
+def classify_archive(metadata):
+    """预扫描分类: "encrypted" 加密, "unencrypted" 无加密, "unsupported" 不支持加密的格式"""
+    if not metadata or metadata["format"] == "unknown":
+        return "unsupported"
+    if metadata["encryption"] == "none" and not metadata["header_encrypted"]:
+        return "unencrypted"
+    return "encrypted"
+
+
+def _entry_filter(metadata):
+    """只测试最小的加密条目（头部加密或文件名含通配符时测试整个压缩文件）"""
+    if not metadata or metadata["header_encrypted"]:
+        return []
+    entry = metadata["smallest_entry"]
+    if not entry or any(c in entry for c in "*?"):
+        return []
+    return [entry]
+
+
+# 7z 输出中表示密码错误/数据错误的标记，出现即可判定失败
+SEVEN_ZIP_FAILURE_MARKERS = (b"Wrong password", b"Data Error", b"CRC Failed",
+                             b"Headers Error", b"Can not open encrypted", b"Cannot open encrypted",
+                             b"Can not open the file as archive")
+# 关闭普通输出和进度行，只保留错误信息（旧版 7z 不支持时不加）
+SEVEN_ZIP_QUIET_SWITCHES = ['-bso0', '-bsp0', '-bse1']
+_seven_zip_quiet_support = {}
+
+
+def seven_zip_supports_quiet(seven_zip_path):
+    """检测 7z 是否支持 -bs 系列开关（9.20 等旧版本不支持），按路径缓存"""
+    supported = _seven_zip_quiet_support.get(seven_zip_path)
+    if supported is None:
+        try:
+            result = subprocess.run([seven_zip_path, 'i'] + SEVEN_ZIP_QUIET_SWITCHES,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                    stdin=subprocess.DEVNULL, timeout=10)
+            supported = result.returncode == 0
+        except Exception:
+            supported = False
+        _seven_zip_quiet_support[seven_zip_path] = supported
+    return supported
+
+
+# 验证引擎：通过 7z 命令行测试，逐行读取输出，首个错误标记出现即终止子进程
+class SevenZipEngine:
+    name = "7z"
+    max_concurrency = None  # 外部进程，不受GIL限制
+    failure_markers = SEVEN_ZIP_FAILURE_MARKERS
+
+    def __init__(self, archive_path, seven_zip_path, metadata=None):
+        self.archive_path = archive_path
+        self.seven_zip_path = seven_zip_path
+        self.entry_filter = _entry_filter(metadata)
+        self.check = ZipCryptoCheck.from_metadata(metadata)
+        self.encodings = (metadata or {}).get("password_encodings") or ['utf-8']
+        self.switches = ['-y'] + (SEVEN_ZIP_QUIET_SWITCHES if seven_zip_supports_quiet(seven_zip_path) else [])
+
+    @classmethod
+    def supports(cls, metadata, seven_zip_path):
+        return os.path.exists(seven_zip_path)
+
+    def quick_reject(self, password):
+        """ZipCrypto 压缩文件先用校验字节过滤，不必启动 7z
+
+        非ASCII密码的编码由7z决定，不做过滤以免漏掉
+        """
+        return self.check is not None and password.isascii() and self.check.rejects(password, self.encodings)
+
+    def command(self, password, whole_archive=False):
+        return ([self.seven_zip_path, 't'] + self.switches + ['-p' + password, self.archive_path]
+                + ([] if whole_archive else self.entry_filter))
+
+    def try_password(self, password):
+        if self.quick_reject(password):
+            return False
+        return self.verify(password)
+
+    def verify(self, password):
+        """不经过校验字节预过滤，直接启动 7z 验证（测速使用）"""
+        return self.run_test(self.command(password))
+
+    def confirm(self, password):
+        """命中后测试整个压缩文件复核，排除只测单个条目造成的误报"""
+        if not self.entry_filter:
+            return True  # 本来测试的就是整个压缩文件
+        return self.run_test(self.command(password, whole_archive=True))
+
+    def run_test(self, cmd):
+        try:
+            # stderr 合并到 stdout，单管道读取不会死锁
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                       stdin=subprocess.DEVNULL)
+        except Exception:
+            return False
+        try:
+            for line in process.stdout:
+                if any(marker in line for marker in SEVEN_ZIP_FAILURE_MARKERS):
+                    # 不必等 7z 测试完剩余的数据块
+                    process.kill()
+                    return False
+            return process.wait() == 0
+        except Exception:
+            process.kill()
+            return False
+        finally:
+            process.stdout.close()
+            process.wait()
+
+
+# 验证引擎：Python zipfile 进程内解密（仅 ZipCrypto）
+class ZipCryptoEngine:
+    name = "zipfile"
+    max_concurrency = 1  # 纯Python解密受GIL限制，多线程无益
+    # zipfile 能解压的压缩方法：存储、Deflate、BZIP2、LZMA（Deflate64、PPMd 等会抛 NotImplementedError）
+    supported_methods = (0, 8, 12, 14)
+    # 只有这些异常表示密码错误，其他异常说明引擎处理不了这个压缩文件
+    wrong_password_errors = (RuntimeError, zlib.error, zipfile.BadZipFile)
+
+    def __init__(self, archive_path, seven_zip_path=None, metadata=None):
+        self.archive_path = archive_path
+        self.local = threading.local()
+        self.handles = []  # 各线程打开的 ZipFile，结束时统一关闭
+        self.handles_lock = Lock()
+        # 只测试最小的加密条目，CRC校验确认密码
+        self.entry = metadata["smallest_entry"]
+        self.encodings = metadata.get("password_encodings") or ['utf-8']
+        self.check = ZipCryptoCheck.from_metadata(metadata)
+
+    @classmethod
+    def supports(cls, metadata, seven_zip_path):
+        return (metadata["format"] == "zip" and metadata["encryption"] == "zipcrypto"
+                and metadata["smallest_entry"] is not None
+                and all(method in cls.supported_methods for method in metadata.get("compress_types", [None])))
+
+    def try_password(self, password):
+        return self._try(password, self.check)
+
+    def verify(self, password):
+        """不经过多条目校验字节预过滤，每个候选都交给 zipfile 解密（测速使用）"""
+        return self._try(password, None)
+
+    def _try(self, password, check):
+        zf = getattr(self.local, 'zf', None)
+        if zf is None:
+            zf = self.local.zf = zipfile.ZipFile(self.archive_path)
+            with self.handles_lock:
+                self.handles.append(zf)
+        # 纯ASCII密码只有一种字节形式，中文密码依次尝试GBK/UTF-8
+        for pwd in password_variants(password, self.encodings):
+            # 多条目校验字节都通过后才解压最小条目验证CRC
+            if check and not check.matches(pwd):
+                continue
+            try:
+                with zf.open(self.entry, pwd=pwd) as f:
+                    while f.read(1 << 16):
+                        pass
+                return True
+            except NotImplementedError:
+                raise  # RuntimeError 的子类，但表示压缩方法不受支持
+            except self.wrong_password_errors:
+                continue
+        return False
+
+    def confirm(self, password):
+        """命中后解压全部加密条目复核CRC，排除只测单个条目造成的误报"""
+        with zipfile.ZipFile(self.archive_path) as zf:
+            infos = [info for info in zf.infolist() if not info.is_dir() and info.flag_bits & 0x1]
+            for pwd in password_variants(password, self.encodings):
+                try:
+                    for info in infos:
+                        with zf.open(info, pwd=pwd) as f:
+                            while f.read(1 << 16):
+                                pass
+                    return True
+                except NotImplementedError:
+                    raise
+                except self.wrong_password_errors:
+                    continue
+        return False
+
+    def close(self):
+        """关闭各工作线程打开的句柄，避免 Windows 上内存副本被锁住无法删除"""
+        with self.handles_lock:
+            handles, self.handles = self.handles, []
+        for zf in handles:
+            zf.close()
+
+
+# 验证引擎：RAR 官方 unrar 命令行
+class UnrarEngine:
+    name = "unrar"
+    max_concurrency = None
+    failure_markers = ()  # -inul 不输出任何信息，只看退出码
+
+    def __init__(self, archive_path, seven_zip_path, metadata=None):
+        self.archive_path = archive_path
+        self.unrar_path = self.find_unrar(seven_zip_path)
+        self.entry_filter = _entry_filter(metadata)
+
+    @staticmethod
+    def find_unrar(seven_zip_path):
+        """在7z同目录或PATH中查找 unrar"""
+        directory = os.path.dirname(os.path.abspath(seven_zip_path))
+        for name in ("UnRAR.exe", "unrar.exe", "unrar"):
+            candidate = os.path.join(directory, name)
+            if os.path.isfile(candidate):
+                return candidate
+        return shutil.which("unrar")
+
+    @classmethod
+    def supports(cls, metadata, seven_zip_path):
+        return metadata["format"] in ("rar4", "rar5") and cls.find_unrar(seven_zip_path) is not None
+
+    def quick_reject(self, password):
+        return False
+
+    def command(self, password, whole_archive=False):
+        return ([self.unrar_path, 't', '-y', '-inul', '-p' + password, self.archive_path]
+                + ([] if whole_archive else self.entry_filter))
+
+    def try_password(self, password):
+        return self.run_test(self.command(password))
+
+    verify = try_password  # 没有预过滤
+
+    def confirm(self, password):
+        """命中后测试整个压缩文件复核"""
+        if not self.entry_filter:
+            return True
+        return self.run_test(self.command(password, whole_archive=True))
+
+    def run_test(self, cmd):
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            process.communicate()
+            return process.returncode == 0
+        except Exception:
+            return False
+
+
+ENGINE_CLASSES = [ZipCryptoEngine, SevenZipEngine, UnrarEngine]
+
+
+def benchmark_engine(engine, duration=1.0, max_trials=50):
+    """用随机错误密码测速，返回每秒尝试次数（单线程）
+
+    随机密码几乎都会被 ZipCrypto 校验字节预过滤拒绝，所以绕过预过滤测真正的验证速度，
+    否则测到的只是过滤速度，引擎选择和批量大小都会失真
+    """
+    trials = 0
+    start = time.perf_counter()
+    while trials < max_trials:
+        engine.verify(''.join(random.choices(string.ascii_letters + string.digits, k=16)))
+        trials += 1
+        if time.perf_counter() - start >= duration:
+            break
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    return trials / elapsed
+
+
+def select_engine(archive_path, seven_zip_path, duration=1.0, verify_path=None):
+    """读取缓存的元数据并测速所有可用引擎，返回 (最快引擎, 元数据, {引擎名: 速率})
+
+    verify_path 为压缩文件在内存中的副本，引擎从副本读取
+    """
+    metadata = scan_archive_metadata(archive_path, seven_zip_path)
+    rates = {}
+    best = None
+    if metadata is None:
+        return best, metadata, rates
+    engines = []
+    for engine_class in ENGINE_CLASSES:
+        try:
+            if not engine_class.supports(metadata, seven_zip_path):
+                continue
+            engine = engine_class(verify_path or archive_path, seven_zip_path, metadata)
+            engines.append(engine)
+            rate = benchmark_engine(engine, duration)
+        except Exception as e:
+            print(f"引擎 {engine_class.name} 测速失败: {str(e)}")
+            continue
+        rates[engine.name] = rate
+        # 比较的是单线程速率；外部进程引擎可多线程并行，实际总吞吐可能更高
+        if best is None or rate > rates[best.name]:
+            best = engine
+    # 落选引擎打开的文件句柄立即关闭
+    for engine in engines:
+        if engine is not best and hasattr(engine, "close"):
+            engine.close()
+    return best, metadata, rates
+
+
+# 已知明文攻击：调用 bkcrack（Biham–Kocher 算法）从至少12个已知明文字节恢复 ZipCrypto 的三个内部密钥，
+# 用密钥直接解密整个压缩文件，可选继续由密钥反推密码
+def find_bkcrack(seven_zip_path):
+    """在7z同目录或PATH中查找 bkcrack"""
+    directory = os.path.dirname(os.path.abspath(seven_zip_path))
+    for name in ("bkcrack.exe", "bkcrack"):
+        candidate = os.path.join(directory, name)
+        if os.path.isfile(candidate):
+            return candidate
+    return shutil.which("bkcrack")
+
+
+def zipcrypto_entries(archive_path):
+    """ZIP中使用 ZipCrypto 加密的条目名（已知明文攻击的目标）"""
+    with zipfile.ZipFile(archive_path) as zf:
+        return [info.filename for info in zf.infolist()
+                if info.flag_bits & 0x1 and info.compress_type != 99 and not info.is_dir()]
+
+
+class KnownPlaintextAttack:
+    KEYS_PATTERN = re.compile(r'\b([0-9a-fA-F]{8}) ([0-9a-fA-F]{8}) ([0-9a-fA-F]{8})\b')
+    PASSWORD_PATTERN = re.compile(r'as text: (.*)$')
+
+    def __init__(self, bkcrack_path, archive_path, entry, plain_path="", plain_entry="",
+                 offset=0, known_hex=""):
+        self.bkcrack_path = bkcrack_path
+        self.archive_path = archive_path
+        self.entry = entry
+        self.plain_path = plain_path
+        self.plain_entry = plain_entry
+        self.offset = offset
+        self.known_hex = known_hex
+
+    def run_tool(self, args, line_callback=None, stop_check=None):
+        """运行 bkcrack，逐行转发输出（进度行每5秒一条），返回 (退出码, 输出行)"""
+        process = subprocess.Popen([self.bkcrack_path] + args, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                                   encoding='utf-8', errors='ignore')
+        lines = []
+        last_progress = 0
+        try:
+            for line in process.stdout:
+                if stop_check and stop_check():
+                    process.kill()
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                lines.append(line)
+                if line_callback:
+                    if "%" in line:
+                        if time.time() - last_progress < 5:
+                            continue
+                        last_progress = time.time()
+                    line_callback(line)
+        finally:
+            process.stdout.close()
+            process.wait()
+        return process.returncode, lines
+
+    def recover_keys(self, line_callback=None, stop_check=None):
+        """返回三个十六进制密钥，失败返回None"""
+        args = ['-C', self.archive_path, '-c', self.entry]
+        if self.plain_path and self.plain_entry:
+            args += ['-P', self.plain_path, '-p', self.plain_entry]
+        elif self.plain_path:
+            args += ['-p', self.plain_path]
+        if self.plain_path and self.offset:
+            args += ['-o', str(self.offset)]
+        if self.known_hex:
+            args += ['-x', str(self.offset), self.known_hex]
+        returncode, lines = self.run_tool(args, line_callback, stop_check)
+        for line in reversed(lines):
+            match = self.KEYS_PATTERN.search(line)
+            if match:
+                return match.groups()
+        return None
+
+    def decrypt_archive(self, keys, output_path, line_callback=None, stop_check=None):
+        """用密钥解密整个压缩文件，输出无密码的副本"""
+        returncode, _ = self.run_tool(['-C', self.archive_path, '-k', *keys, '-D', output_path],
+                                      line_callback, stop_check)
+        return returncode == 0 and os.path.exists(output_path)
+
+    def recover_password(self, keys, max_length, charset='?p', line_callback=None, stop_check=None):
+        """由密钥反推密码（可打印字符，最长 max_length 位），找不到返回None"""
+        _, lines = self.run_tool(['-k', *keys, '-r', str(max_length), charset], line_callback, stop_check)
+        for line in lines:
+            match = self.PASSWORD_PATTERN.search(line)
+            if match:
+                return match.group(1)
+        return None
+
+
+# 压缩文件内存副本：每个压缩文件只从原位置读取一次，复制到 tmpfs（无 tmpfs 时为本地临时目录），
+# 所有工作线程和外部验证进程都读取副本，破解结束后释放
+class ArchivePinCache:
+    MULTI_VOLUME_PATTERN = re.compile(r'\.(\d{3}|part\d+\.rar|r\d{2}|z\d{2})$', re.IGNORECASE)
+
+    def __init__(self, max_bytes=1 << 30, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory or self.find_directory()
+        self.lock = Lock()
+        self.pins = {}  # 原路径 -> {"path": 副本路径, "size": 大小, "refs": 引用数}
+        self.used = 0
+
+    @staticmethod
+    def find_directory():
+        """优先使用内存文件系统 /dev/shm"""
+        if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+            return "/dev/shm"
+        return tempfile.gettempdir()
+
+    def can_pin(self, archive_path, size):
+        # 分卷压缩文件需要同目录的其他分卷，不能单独复制
+        if self.MULTI_VOLUME_PATTERN.search(archive_path):
+            return False
+        if os.path.exists(os.path.splitext(archive_path)[0] + ".z01"):
+            return False
+        if self.used + size > self.max_bytes:
+            return False
+        return shutil.disk_usage(self.directory).free > size * 2
+
+    def acquire(self, archive_path):
+        """返回验证用的路径：已复制或复制成功时为副本，否则为原路径"""
+        with self.lock:
+            pin = self.pins.get(archive_path)
+            if pin:
+                pin["refs"] += 1
+                return pin["path"]
+            try:
+                size = os.path.getsize(archive_path)
+                if not self.can_pin(archive_path, size):
+                    return archive_path
+                fd, pin_path = tempfile.mkstemp(prefix="cracker_", suffix="_" + os.path.basename(archive_path),
+                                                dir=self.directory)
+                with os.fdopen(fd, 'wb') as dst, open(archive_path, 'rb') as src:
+                    shutil.copyfileobj(src, dst, 1 << 20)
+            except Exception as e:
+                print(f"复制压缩文件到内存失败: {str(e)}")
+                return archive_path
+            self.pins[archive_path] = {"path": pin_path, "size": size, "refs": 1}
+            self.used += size
+            return pin_path
+
+    def release(self, archive_path):
+        """引用数归零时删除副本"""
+        with self.lock:
+            pin = self.pins.get(archive_path)
+            if not pin:
+                return
+            pin["refs"] -= 1
+            if pin["refs"] > 0:
+                return
+            del self.pins[archive_path]
+            self.used -= pin["size"]
+        self._remove(pin["path"])
+
+    def release_all(self):
+        with self.lock:
+            pins = list(self.pins.values())
+            self.pins.clear()
+            self.used = 0
+        for pin in pins:
+            self._remove(pin["path"])
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"删除压缩文件副本失败: {str(e)}")
+
+
+# 异步验证器：单个事件循环线程管理所有外部工具子进程，信号量限制同时运行的进程数
+class AsyncVerifier:
+    def __init__(self, concurrency=64, timeout=300.0):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.semaphore = None  # 在事件循环线程中创建
+        self.loop = asyncio.new_event_loop()
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+        self.loop.close()
+
+    def submit(self, coro):
+        """从任意线程提交协程，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def run_command(self, cmd, failure_markers=()):
+        """运行验证命令，退出码为0返回True；输出中出现失败标记立即终止进程
+
+        超时抛出 asyncio.TimeoutError
+        """
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.concurrency)
+        async with self.semaphore:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                stdin=asyncio.subprocess.DEVNULL)
+            try:
+                return await asyncio.wait_for(self._watch(process, failure_markers), self.timeout)
+            finally:
+                # 失败标记、超时或任务取消时终止子进程
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+    async def _watch(self, process, failure_markers):
+        if failure_markers:
+            async for line in process.stdout:
+                if any(marker in line for marker in failure_markers):
+                    return False
+        else:
+            await process.stdout.read()
+        return await process.wait() == 0
+
+    def shutdown(self):
+        """取消所有验证任务（终止子进程）并停止事件循环"""
+        async def cancel_all():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            self.submit(cancel_all()).result(5)
+        except Exception as e:
+            print(f"停止异步验证器失败: {str(e)}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(2)
+
+
+# 通过异步验证器运行协程任务的执行器，接口与 ScheduledExecutor 一致
+class AsyncExecutor:
+    def __init__(self, verifier):
+        self.verifier = verifier
+        self.lock = Lock()
+        self.futures = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # 取消尚未完成的协程（会终止其子进程）
+        with self.lock:
+            futures = list(self.futures)
+        for future in futures:
+            future.cancel()
+        wait(futures)
+
+    def submit(self, coroutine_function, *args):
+        future = self.verifier.submit(coroutine_function(*args))
+        with self.lock:
+            self.futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self.lock:
+            self.futures.discard(future)
+
+
+# 全局任务调度器：固定数量的工作线程，按压缩文件的优先级/截止时间/权重分配
+class JobScheduler:
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self.cond = Condition()
+        self.queues = {}  # 压缩文件 -> deque[(future, fn, args)]
+        self.jobs = {}  # 压缩文件 -> {"priority", "weight", "deadline", "served"}
+        self._shutdown = False
+        self.workers = [Thread(target=self._worker, daemon=True) for _ in range(max_workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def register(self, archive_path, priority=0, weight=1, deadline=None):
+        """登记压缩文件任务；deadline 为绝对时间戳"""
+        with self.cond:
+            self.jobs[archive_path] = self._new_job(priority, weight, deadline)
+            self.queues.setdefault(archive_path, deque())
+
+    def _new_job(self, priority, weight, deadline):
+        """新任务的已服务数从当前最小的 已服务数/权重 起算，否则晚登记的任务会长期独占工作线程
+
+        调用方持有 self.cond
+        """
+        weight = max(1, weight)
+        served = min((job["served"] / job["weight"] for path, job in self.jobs.items()
+                      if self.queues.get(path) or job["running"]), default=0)
+        return {
+            "priority": priority,
+            "weight": weight,
+            "deadline": deadline,
+            "served": served * weight,
+            "running": 0,
+            "max_concurrency": None
+        }
+
+    def unregister(self, archive_path):
+        """压缩文件完成或停止，取消其排队中的任务，立即把工作线程让给其他任务"""
+        with self.cond:
+            queue = self.queues.pop(archive_path, deque())
+            self.jobs.pop(archive_path, None)
+        for future, _, _ in queue:
+            future.cancel()
+
+    def set_max_concurrency(self, archive_path, max_concurrency):
+        """限制某个压缩文件同时占用的工作线程数（None为不限制）"""
+        with self.cond:
+            if archive_path in self.jobs:
+                self.jobs[archive_path]["max_concurrency"] = max_concurrency
+            self.cond.notify_all()
+
+    def submit(self, archive_path, fn, *args):
+        future = Future()
+        with self.cond:
+            if self._shutdown:
+                raise RuntimeError("调度器已关闭")
+            if archive_path not in self.jobs:
+                self.jobs[archive_path] = self._new_job(0, 1, None)
+            self.queues.setdefault(archive_path, deque()).append((future, fn, args))
+            self.cond.notify()
+        return future
+
+    def _pick(self):
+        """选择下一个要服务的压缩文件：优先级高的先，其次截止时间早的，再按权重公平分配"""
+        best = None
+        best_key = None
+        for archive_path, queue in self.queues.items():
+            if not queue:
+                continue
+            job = self.jobs[archive_path]
+            if job["max_concurrency"] and job["running"] >= job["max_concurrency"]:
+                continue
+            deadline = job["deadline"] if job["deadline"] is not None else float('inf')
+            key = (-job["priority"], deadline, job["served"] / job["weight"])
+            if best_key is None or key < best_key:
+                best, best_key = archive_path, key
+        return best
+
+    def _worker(self):
+        while True:
+            with self.cond:
+                archive_path = self._pick()
+                while archive_path is None and not self._shutdown:
+                    self.cond.wait()
+                    archive_path = self._pick()
+                if archive_path is None:
+                    return
+                future, fn, args = self.queues[archive_path].popleft()
+                job = self.jobs[archive_path]
+                job["served"] += 1
+                job["running"] += 1
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args))
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self.cond:
+                    job["running"] -= 1
+                    self.cond.notify()
+
+    def shutdown(self):
+        with self.cond:
+            self._shutdown = True
+            queues = list(self.queues.values())
+            self.queues.clear()
+            self.cond.notify_all()
+        for queue in queues:
+            for future, _, _ in queue:
+                future.cancel()
+
+
+# 通过全局调度器提交任务的执行器，接口与 ThreadPoolExecutor 一致
+class ScheduledExecutor:
+    def __init__(self, scheduler, archive_path):
+        self.scheduler = scheduler
+        self.archive_path = archive_path
+        self.lock = Lock()
+        self.futures = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # 取消尚未开始的任务，只等待正在执行的任务
+        with self.lock:
+            futures = list(self.futures)
+        for future in futures:
+            future.cancel()
+        wait(futures)
+
+    def submit(self, fn, *args):
+        future = self.scheduler.submit(self.archive_path, fn, *args)
+        with self.lock:
+            self.futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self.lock:
+            self.futures.discard(future)
+
+
 # 破解线程类
 class ArchiveCracker(QThread):
     progress_updated = pyqtSignal(int, int, int)  # current, total, file_index
@@ -230,9 +2494,13 @@ class ArchiveCracker(QThread):
     password_found = pyqtSignal(str, str)  # archive_path, password
     finished = pyqtSignal(str, bool)  # archive_path, success
     current_file_changed = pyqtSignal(str)
+    total_counted = pyqtSignal(str, int)  # archive_path, 候选总数（在破解线程中统计完成后发出）
 
     def __init__(self, archive_path, dictionary_paths, recursive=False, seven_zip_path="7z.exe", 
-                 resume_info=None, max_workers=1, ai_enabled=False, ai_generator=None):
+                 resume_info=None, max_workers=1, ai_enabled=False, ai_generator=None,
+                 rule_engine=None, candidate_generator=None, priority_passwords=None,
+                 journal=None, scheduler=None, password_log=None, async_verifier=None,
+                 archive_pins=None):
         super().__init__()
         self.archive_path = archive_path
         self.dictionary_paths = dictionary_paths
@@ -252,6 +2520,20 @@ class ArchiveCracker(QThread):
         self.ai_generator = ai_generator or AIPasswordGenerator()
         self.ai_passwords = []
         self.ai_index = 0
+        self.rule_engine = rule_engine
+        self.candidate_generator = candidate_generator
+        self.priority_passwords = priority_passwords or []
+        self.journal = journal
+        self.scheduler = scheduler
+        self.password_log = password_log
+        self.async_verifier = async_verifier
+        self.archive_pins = archive_pins
+        self.injected = deque()  # 其他压缩文件找到的密码，优先于所有候选尝试
+        self.injected_seen = set(self.priority_passwords)
+        self.verify_path = archive_path  # 验证时读取的路径（可能是内存副本）
+        self.engine = SevenZipEngine(archive_path, seven_zip_path)
+        self.metadata = None
+        self.chunk_size = 1000
 
     def stop(self):
         with self.lock:
@@ -274,109 +2556,458 @@ class ArchiveCracker(QThread):
             return self._stop_flag
 
     def count_passwords(self, file_path):
+        return count_file_lines(file_path)
+
+    def report_found(self, password):
+        """命中：立即停止本压缩文件的其余任务，先落盘记录，再通知界面"""
+        self.stop()
+        self.found_password = password
         try:
-            with codecs.open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return sum(1 for _ in f)
-        except:
-            try:
-                with codecs.open(file_path, 'r', encoding='gbk', errors='ignore') as f:
-                    return sum(1 for _ in f)
-            except:
-                return 0
+            if self.password_log:
+                self.password_log.record(self.archive_path, password)
+            if self.journal:
+                self.journal.mark_solved(self.archive_path)
+        except Exception as e:
+            self.status_message.emit(f"记录密码失败: {str(e)}")
+        self.password_found.emit(self.archive_path, password)
 
     def try_password(self, password):
+        engine = self.engine
         try:
-            cmd = [self.seven_zip_path, 't', '-p' + password, self.archive_path]
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            stdout, stderr = process.communicate()
-            
-            if process.returncode == 0:
-                return True
-            return False
+            return engine.try_password(password) and self.confirm_hit(password)
         except Exception as e:
+            if not self.fall_back_to_7z(engine, e):
+                raise
+        return self.try_password(password)
+
+    def confirm_hit(self, password):
+        """引擎只测了最小条目，命中后对整个压缩文件复核再报告"""
+        if self.engine.confirm(password):
+            return True
+        self.status_message.emit(f"{os.path.basename(self.archive_path)}: 误报已排除（整体复核未通过）: {password}")
+        return False
+
+    def fall_back_to_7z(self, engine, error):
+        """进程内引擎遇到密码错误以外的异常时改用 7z，返回是否已经切换"""
+        with self.lock:
+            if self.engine is not engine:
+                return True  # 其他线程已经切换过
+            if isinstance(engine, SevenZipEngine):
+                return False
+            self.engine = SevenZipEngine(self.verify_path, self.seven_zip_path, self.metadata)
+        if hasattr(engine, "close"):
+            engine.close()
+        if self.scheduler:
+            self.scheduler.set_max_concurrency(self.archive_path, self.engine.max_concurrency)
+        self.status_message.emit(
+            f"{os.path.basename(self.archive_path)}: {engine.name} 引擎出错 ({str(error)}), 改用 7z")
+        return True
+
+    def inject_passwords(self, passwords):
+        """插入其他压缩文件刚找到的密码（同批文件往往共用密码），可从任意线程调用"""
+        with self.lock:
+            new = [password for password in passwords if password not in self.injected_seen]
+            self.injected_seen.update(new)
+            self.injected.extend(new)
+            self.total_passwords += len(new)
+
+    def process_injected(self):
+        """在分发下一批候选之前，直接在调度线程中尝试插入的密码，命中返回True"""
+        with self.lock:
+            if not self.injected:
+                return False
+            passwords = list(self.injected)
+            self.injected.clear()
+        tried = 0
+        try:
+            for password in passwords:
+                if self.is_stopped():
+                    return False
+                tried += 1
+                if self.try_password(password):
+                    self.status_message.emit(f"{self.archive_path}: 其他压缩文件的密码命中")
+                    self.report_found(password)
+                    return True
+        finally:
+            self.count_tried(tried)
+        return False
+
+    def uses_async(self):
+        """外部工具引擎且启用了异步验证器时，由事件循环驱动验证"""
+        return self.async_verifier is not None and hasattr(self.engine, "command")
+
+    def in_flight_limit(self):
+        """同时在途的验证数上限"""
+        return self.async_verifier.concurrency if self.uses_async() else self.max_workers
+
+    async def try_password_async(self, password):
+        if self.engine.quick_reject(password):
             return False
+        try:
+            if not await self.async_verifier.run_command(self.engine.command(password),
+                                                         self.engine.failure_markers):
+                return False
+        except asyncio.TimeoutError:
+            self.status_message.emit(f"{os.path.basename(self.archive_path)}: 验证超时: {password}")
+            return False
+        # 复核是少见的同步调用，放到线程池里，不阻塞事件循环
+        return await asyncio.get_running_loop().run_in_executor(None, self.confirm_hit, password)
+
+    def probe_engine(self):
+        """识别压缩格式，测速可用引擎，选择最快的引擎和批量大小"""
+        if self.scheduler:
+            # 测速占用调度器的一个工作线程，多个压缩文件不会同时测速抢占CPU
+            try:
+                engine, metadata, rates = self.scheduler.submit(
+                    self.archive_path, select_engine, self.archive_path, self.seven_zip_path,
+                    1.0, self.verify_path).result()
+            except CancelledError:
+                return  # 测速前已经停止
+        else:
+            engine, metadata, rates = select_engine(self.archive_path, self.seven_zip_path,
+                                                    verify_path=self.verify_path)
+        self.metadata = metadata
+        rate_text = ", ".join(f"{name} {rate:.1f}次/秒" for name, rate in rates.items()) or "无"
+        if engine is None:
+            self.status_message.emit(
+                f"{os.path.basename(self.archive_path)}: {describe_archive_metadata(metadata)}, 没有可用引擎测速成功, 使用 7z")
+            return
+        self.engine = engine
+        # 每个生成器区间约占用工作线程2秒
+        self.chunk_size = max(10, min(100000, int(rates[engine.name] * 2)))
+        if self.scheduler:
+            self.scheduler.set_max_concurrency(self.archive_path, engine.max_concurrency)
+        self.status_message.emit(
+            f"{os.path.basename(self.archive_path)}: {describe_archive_metadata(metadata)}, "
+            f"引擎测速: {rate_text}, 选择 {engine.name}, 批量 {self.chunk_size}")
+
+    def create_executor(self):
+        """异步验证时提交到事件循环；有全局调度器时共享其工作线程，否则使用独立线程池"""
+        if self.uses_async():
+            return AsyncExecutor(self.async_verifier)
+        if self.scheduler:
+            return ScheduledExecutor(self.scheduler, self.archive_path)
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def checkpoint(self, key, entry):
+        """更新恢复点，并写入检查点日志（日志按时间间隔批量落盘）"""
+        self.resume_info[key] = entry
+        if self.journal:
+            self.journal.update(self.archive_path, key, entry)
+
+    def try_batch(self, batch, encoding):
+        """尝试一批字典行（规则模式下包括每行的所有变换）
+
+        返回 (是否完整测试, 找到的密码, 规则序号)
+        """
+        tried = 0
+        try:
+            for k in range(len(batch)):
+                word = batch.decode(k, encoding)
+                if not word:
+                    continue
+                if not self.rule_engine:
+                    if self.is_stopped():
+                        return False, None, None
+                    while self.is_paused() and not self.is_stopped():
+                        self.msleep(100)
+                    tried += 1
+                    if self.try_password(word):
+                        return True, word, None
+                    continue
+                for candidate, rule_index in self.rule_engine.apply_word(word):
+                    if self.is_stopped():
+                        return False, None, None
+                    tried += 1
+                    if self.try_password(candidate):
+                        return True, candidate, rule_index
+            return True, None, None
+        finally:
+            self.count_tried(tried)
+
+    async def try_batch_async(self, batch, encoding):
+        """try_batch 的协程版本"""
+        tried = 0
+        try:
+            for k in range(len(batch)):
+                word = batch.decode(k, encoding)
+                if not word:
+                    continue
+                if not self.rule_engine:
+                    if self.is_stopped():
+                        return False, None, None
+                    while self.is_paused() and not self.is_stopped():
+                        await asyncio.sleep(0.1)
+                    tried += 1
+                    if await self.try_password_async(word):
+                        return True, word, None
+                    continue
+                for candidate, rule_index in self.rule_engine.apply_word(word):
+                    if self.is_stopped():
+                        return False, None, None
+                    tried += 1
+                    if await self.try_password_async(candidate):
+                        return True, candidate, rule_index
+            return True, None, None
+        finally:
+            self.count_tried(tried)
+
+    def try_password_list(self, passwords, line_num):
+        """尝试一组内存中的密码（历史密码、AI密码），返回找到的密码或None"""
+        try_one = self.try_password_with_progress_async if self.uses_async() else self.try_password_with_progress
+        with self.create_executor() as executor:
+            futures = [executor.submit(try_one, password, line_num)
+                       for password in passwords]
+            try:
+                for future in as_completed(futures):
+                    if self.is_stopped():
+                        return None
+                    result, password, _, _ = future.result()
+                    if result:
+                        return password
+            finally:
+                # 命中或停止后不再执行排队中的密码
+                for future in futures:
+                    future.cancel()
+        return None
+
+    def iter_dictionary_lines(self, dict_file, start_line, start_offset):
+        """从指定字节偏移开始逐行读取，生成 (行号, 行起始偏移, 原始字节)"""
+        if start_offset:
+            dict_file.seek(start_offset)
+        offset = start_offset
+        for i, raw in enumerate(dict_file, start_line):
+            yield i, offset, raw
+            offset += len(raw)
 
     def process_dictionary(self, dict_path, dict_index):
         try:
-            # 检查是否有恢复点
+            # 检查是否有恢复点，字典未变化时按字节偏移直接定位
             resume_line = 0
-            if str(dict_index) in self.resume_info:
-                if self.resume_info[str(dict_index)]["file"] == dict_path:
-                    resume_line = self.resume_info[str(dict_index)]["line"]
-                    self.status_message.emit(f"从字典 {dict_path} 的第 {resume_line} 行恢复")
+            resume_offset = 0
+            dict_size = os.path.getsize(dict_path)
+            resume_entry = self.resume_info.get(str(dict_index))
+            if resume_entry and resume_entry["file"] == dict_path:
+                resume_line = resume_entry["line"]
+                if "offset" in resume_entry and resume_entry.get("size") == dict_size:
+                    resume_offset = resume_entry["offset"]
+                self.status_message.emit(f"从字典 {dict_path} 的第 {resume_line} 行恢复")
 
             # 如果是AI模式且是第一个字典，先学习模式
             if self.ai_enabled and dict_index == 0 and os.path.isfile(dict_path):
                 self.status_message.emit(f"AI正在学习字典模式: {dict_path}")
-                self.ai_generator.learn_from_dictionary(dict_path)
+                self.ai_generator.learn_from_dictionary(dict_path, self.seven_zip_path)
                 self.ai_passwords = self.ai_generator.generate_passwords(1000)
                 self.status_message.emit(f"AI已生成 {len(self.ai_passwords)} 个智能密码")
 
-            # 尝试UTF-8编码
-            try:
-                with codecs.open(dict_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-            except:
-                # 尝试GBK编码
-                with codecs.open(dict_path, 'r', encoding='gbk', errors='ignore') as f:
-                    lines = f.readlines()
-
+            # 每个字典只检测一次编码，热循环中按检测结果直接解码
+            encoding = detect_dictionary_encoding(dict_path, self.seven_zip_path)
+            if encoding == 'utf-16':
+                self.status_message.emit(f"字典 {dict_path} 为UTF-16编码，无法逐行读取，请转换为UTF-8或GBK")
+                return False
+            bom = codecs.BOM_UTF8 if encoding == 'utf-8-sig' else b""
+            codec = 'utf-8' if bom else encoding
+            if codec != 'utf-8':
+                self.status_message.emit(f"字典 {os.path.basename(dict_path)} 编码: {codec}")
+
+            total_lines = self.count_passwords(dict_path)
             self.current_file_changed.emit(f"当前字典: {os.path.basename(dict_path)}")
             
-            # 使用线程池处理密码尝试
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = []
-                for i, line in enumerate(lines):
-                    if i < resume_line:
-                        continue
-
+            # 按批分发给工作线程（每批约占用工作线程2秒），只保留有限数量的在途批次，
+            # 恢复点记录为尚未完整测试的批次的最小起始行（低水位），确保恢复时不漏测
+            pending = {}  # future -> 批次起始 (行号, 字节偏移)
+            max_pending = self.in_flight_limit() * 2
+            batch_lines = max(1, self.chunk_size // (len(self.rule_engine) if self.rule_engine else 1))
+            try_batch = self.try_batch_async if self.uses_async() else self.try_batch
+            next_position = (resume_line, resume_offset)
+            lines_exhausted = False
+
+            # 压缩字典流式解压，无法按偏移定位，恢复时逐行跳过
+            compressed = is_compressed_dictionary(dict_path)
+            if compressed:
+                resume_offset = 0
+            with (CompressedDictionaryReader(dict_path, self.seven_zip_path) if compressed
+                  else open(dict_path, 'rb')) as dict_file, \
+                    self.create_executor() as executor:
+                line_iter = self.iter_dictionary_lines(
+                    dict_file, resume_line if resume_offset else 0, resume_offset)
+
+                while True:
                     while self.is_paused() and not self.is_stopped():
                         self.msleep(100)
 
-                    if self.is_stopped():
-                        # 保存当前进度
-                        self.resume_info[str(dict_index)] = {
-                            "file": dict_path,
-                            "line": i
-                        }
-                        return False
-
-                    password = line.strip()
-                    if not password:
-                        continue
-
-                    futures.append(executor.submit(self.try_password_with_progress, password, i))
+                    if self.process_injected():
+                        return True
 
-                # 如果是AI模式，添加生成的密码
-                if self.ai_enabled and dict_index == 0:
-                    for pwd in self.ai_passwords:
-                        if self.is_stopped():
-                            break
-                        futures.append(executor.submit(self.try_password_with_progress, pwd, -1))  # -1表示AI生成的密码
+                    while not lines_exhausted and len(pending) < max_pending and not self.is_stopped():
+                        batch = None
+                        for i, offset, raw in line_iter:
+                            if i < resume_line:
+                                continue  # 旧格式恢复点没有字节偏移，只能逐行跳过（不解码）
+                            if batch is None:
+                                batch = CandidateBatch((i, offset))
+                            next_position = (i + 1, offset + len(raw))
+                            if offset == 0 and bom and raw.startswith(bom):
+                                raw = raw[len(bom):]
+                            batch.append(raw)
+                            if len(batch) >= batch_lines:
+                                break
+                        else:
+                            lines_exhausted = True
+                            if compressed and not resume_line:
+                                record_line_count(dict_path, next_position[0])
+                        if batch is not None:
+                            pending[executor.submit(try_batch, batch, codec)] = batch.origin
+
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    incomplete = []
+                    for future in done:
+                        position = pending.pop(future)
+                        completed, password, rule_index = future.result()
+                        if password is not None:
+                            self.report_found(password)
+                            if rule_index is not None:
+                                self.rule_engine.record_hit(rule_index)
+                                self.status_message.emit(
+                                    f"命中规则: {self.rule_engine.rules[rule_index][0]}")
+                            return True
+                        if not completed:
+                            incomplete.append(position)
+
+                    low_line, low_offset = min([*pending.values(), *incomplete, next_position])
+                    self.checkpoint(str(dict_index), {
+                        "file": dict_path, "line": low_line, "offset": low_offset,
+                        "size": dict_size, "total": total_lines
+                    })
 
-                for future in as_completed(futures):
                     if self.is_stopped():
                         return False
 
-                    result, password, line_num = future.result()
-                    if result:
-                        self.found_password = password
-                        self.password_found.emit(self.archive_path, password)
-                        return True
+            # 如果是AI模式，尝试生成的密码
+            if self.ai_enabled and dict_index == 0 and not self.is_stopped():
+                password = self.try_password_list(self.ai_passwords, -1)  # -1表示AI生成的密码
+                if password is not None:
+                    self.report_found(password)
+                    return True
 
         except Exception as e:
             self.status_message.emit(f"处理字典文件 {dict_path} 时出错: {str(e)}")
             return False
 
-    def try_password_with_progress(self, password, line_num):
-        result = self.try_password(password)
-        
+    def process_priority_passwords(self):
+        """优先尝试历史上找到过的密码"""
+        self.current_file_changed.emit("当前字典: 历史密码")
+        password = self.try_password_list(self.priority_passwords, -2)  # -2表示历史密码
+        if password is not None:
+            self.status_message.emit(f"{self.archive_path}: 历史密码命中")
+            self.report_found(password)
+            return True
+        return False
+
+    def try_generator_range(self, start, end):
+        """尝试生成器区间 [start, end) 内的所有候选，返回 (是否完整测试, 找到的密码)"""
+        tried = 0
+        try:
+            for _, password in self.candidate_generator.iter_range(start, end):
+                if self.is_stopped():
+                    return False, None
+                while self.is_paused() and not self.is_stopped():
+                    self.msleep(100)
+                tried += 1
+                if self.try_password(password):
+                    return True, password
+            return True, None
+        finally:
+            self.count_tried(tried)
+
+    async def try_generator_range_async(self, start, end):
+        """try_generator_range 的协程版本"""
+        tried = 0
+        try:
+            for _, password in self.candidate_generator.iter_range(start, end):
+                if self.is_stopped():
+                    return False, None
+                while self.is_paused() and not self.is_stopped():
+                    await asyncio.sleep(0.1)
+                tried += 1
+                if await self.try_password_async(password):
+                    return True, password
+            return True, None
+        finally:
+            self.count_tried(tried)
+
+    def generator_resume_index(self):
+        """返回候选生成器的恢复序号（无匹配恢复点时为0）"""
+        generator_resume = self.resume_info.get("generator", {})
+        if generator_resume.get("key") == self.candidate_generator.resume_key:
+            return generator_resume.get("index", 0)
+        return 0
+
+    def process_generator(self):
+        """掩码/混合/组合攻击：按连续区间分发给工作线程，按最小未完成序号记录恢复点"""
+        generator = self.candidate_generator
+        start_index = self.generator_resume_index()
+        if start_index:
+            self.status_message.emit(f"从 {generator.name} 的第 {start_index} 个候选恢复")
+
+        self.current_file_changed.emit(f"当前生成器: {generator.name}")
+        pending = {}  # future -> 区间起点
+        next_index = start_index
+        max_pending = self.in_flight_limit() * 2
+        try_range = self.try_generator_range_async if self.uses_async() else self.try_generator_range
+
+        with self.create_executor() as executor:
+            while pending or (next_index < generator.keyspace and not self.is_stopped()):
+                if self.process_injected():
+                    return True
+
+                while (len(pending) < max_pending and next_index < generator.keyspace
+                       and not self.is_stopped()):
+                    end = min(next_index + self.chunk_size, generator.keyspace)
+                    pending[executor.submit(try_range, next_index, end)] = next_index
+                    next_index = end
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                incomplete = []
+                for future in done:
+                    start = pending.pop(future)
+                    completed, password = future.result()
+                    if password is not None:
+                        self.report_found(password)
+                        return True
+                    if not completed:
+                        incomplete.append(start)
+
+                # 恢复点取尚未完成的最小区间起点，确保不漏测
+                low_water = min([*pending.values(), *incomplete, next_index])
+                self.checkpoint("generator", {"name": generator.name, "key": generator.resume_key,
+                                              "index": low_water})
+
+                if self.is_stopped():
+                    return False
+        return False
+
+    def count_tried(self, count=1):
+        """累计已尝试数并更新进度（批量任务完成后一次性累加）"""
+        if not count:
+            return
         with self.lock:
-            self.tried_passwords += 1
+            self.tried_passwords += count
             progress = int((self.tried_passwords / self.total_passwords) * 100)
             self.progress_updated.emit(progress, self.tried_passwords, self.current_dict_index)
-        
-        return (result, password, line_num)
+
+    def try_password_with_progress(self, password, line_num, rule_index=None):
+        result = self.try_password(password)
+        self.count_tried()
+        return (result, password, line_num, rule_index)
+
+    async def try_password_with_progress_async(self, password, line_num, rule_index=None):
+        result = await self.try_password_async(password)
+        self.count_tried()
+        return (result, password, line_num, rule_index)
 
     def run(self):
         try:
@@ -392,15 +3023,35 @@ class ArchiveCracker(QThread):
                 self.finished.emit(self.archive_path, False)
                 return
 
-            # 计算总密码数
+            # 压缩文件只读取一次，之后所有验证都读取内存副本
+            if self.archive_pins:
+                self.verify_path = self.archive_pins.acquire(self.archive_path)
+                if self.verify_path != self.archive_path:
+                    self.engine = SevenZipEngine(self.verify_path, self.seven_zip_path)
+                    self.status_message.emit(
+                        f"{os.path.basename(self.archive_path)}: 已复制到 {self.archive_pins.directory}")
+
+            # 识别格式并选择最快的验证引擎
+            self.probe_engine()
+            if self.uses_async():
+                self.status_message.emit(
+                    f"{os.path.basename(self.archive_path)}: 异步验证 (并发 {self.async_verifier.concurrency})")
+
+            # 计算总密码数（规则模式下每个单词展开为多条候选）
+            rule_factor = len(self.rule_engine) if self.rule_engine else 1
             self.total_passwords = 0
             for i, dict_path in enumerate(self.dictionary_paths):
                 if os.path.isfile(dict_path):
                     # 如果是恢复模式，只计算未尝试的部分
                     if str(i) in self.resume_info:
                         if self.resume_info[str(i)]["file"] == dict_path:
-                            total_lines = self.count_passwords(dict_path)
-                            resume_line = self.resume_info[str(i)]["line"]
+                            resume_entry = self.resume_info[str(i)]
+                            # 恢复点中记录了总行数且字典未变化时无需重新计数
+                            if "total" in resume_entry and resume_entry.get("size") == os.path.getsize(dict_path):
+                                total_lines = resume_entry["total"]
+                            else:
+                                total_lines = self.count_passwords(dict_path)
+                            resume_line = resume_entry["line"]
                             self.total_passwords += (total_lines - resume_line)
                         else:
                             self.total_passwords += self.count_passwords(dict_path)
@@ -411,15 +3062,33 @@ class ArchiveCracker(QThread):
                         for file in files:
                             file_path = os.path.join(root, file)
                             self.total_passwords += self.count_passwords(file_path)
+            self.total_passwords *= rule_factor
+
+            # 历史密码
+            self.total_passwords += len(self.priority_passwords)
 
             # 如果是AI模式，增加生成的密码数量
             if self.ai_enabled:
                 self.total_passwords += 1000  # AI生成的密码数量
 
+            # 掩码/混合/组合模式，增加剩余的候选数
+            # 混合/组合模式的字典在这里（破解线程中）第一次计数并建立索引
+            if self.candidate_generator:
+                self.total_passwords += self.candidate_generator.keyspace - self.generator_resume_index()
+
             if self.total_passwords == 0:
                 self.status_message.emit("错误: 没有找到有效的字典文件或密码")
                 self.finished.emit(self.archive_path, False)
                 return
+            self.total_counted.emit(self.archive_path, self.total_passwords)
+
+            # 先尝试历史密码和其他压缩文件刚找到的密码
+            if self.priority_passwords and self.process_priority_passwords():
+                self.finished.emit(self.archive_path, True)
+                return
+            if self.process_injected():
+                self.finished.emit(self.archive_path, True)
+                return
 
             # 处理字典文件
             for i, dict_path in enumerate(self.dictionary_paths):
@@ -440,12 +3109,448 @@ class ArchiveCracker(QThread):
                                 self.finished.emit(self.archive_path, True)
                                 return
 
+            # 字典处理完后进行掩码/混合/组合攻击
+            if self.candidate_generator and not self.is_stopped():
+                if self.process_generator():
+                    self.finished.emit(self.archive_path, True)
+                    return
+
             self.status_message.emit(f"{self.archive_path}: 密码未找到")
             self.finished.emit(self.archive_path, False)
         except Exception as e:
             print(f"[DEBUG] 发生错误: {str(e)}")
             self.status_message.emit(f"发生错误: {str(e)}")
             self.finished.emit(self.archive_path, False)
+        finally:
+            # 关闭引擎打开的句柄，否则 Windows 上内存副本无法删除
+            if hasattr(self.engine, "close"):
+                self.engine.close()
+            # 破解成功、停止或出错后立即释放内存副本
+            if self.verify_path != self.archive_path:
+                self.archive_pins.release(self.archive_path)
+                self.verify_path = self.archive_path
+
+
+# 状态日志：环形缓冲，定时批量刷新到界面，可选写入自动轮转的日志文件
+class StatusLog:
+    def __init__(self, view, max_lines=5000, flush_interval=200):
+        self.view = view
+        self.lines = deque(maxlen=max_lines)  # 最近的日志（纯文本）
+        self.pending = deque(maxlen=max_lines)  # 等待刷新到界面的HTML行
+        self.view.setMaximumBlockCount(max_lines)  # 界面只保留最近的行
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(flush_interval)
+        self.timer.timeout.connect(self.flush)
+        self.file_logger = None
+
+    def set_log_file(self, path, max_bytes=10 * 1024 * 1024, backup_count=5):
+        """启用(path)或关闭(None)日志文件，超过 max_bytes 自动轮转"""
+        logger = logging.getLogger("cracker.status")
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+            handler.close()
+        self.file_logger = None
+        if not path:
+            return
+        try:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        except OSError as e:
+            self.append(f"打开日志文件失败: {str(e)}")
+            return
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        self.file_logger = logger
+
+    def append(self, text):
+        """追加一行纯文本"""
+        self.append_html(html.escape(text).replace("\n", "<br>"), text)
+
+    def append_html(self, html_text, plain_text):
+        self.lines.append(plain_text)
+        self.pending.append(html_text)
+        if self.file_logger:
+            self.file_logger.info(plain_text)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """把积攒的行一次性加入界面"""
+        if not self.pending:
+            return
+        scrollbar = self.view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        self.view.setUpdatesEnabled(False)
+        try:
+            while self.pending:
+                self.view.appendHtml(self.pending.popleft())
+        finally:
+            self.view.setUpdatesEnabled(True)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def clear(self):
+        self.lines.clear()
+        self.pending.clear()
+        self.view.clear()
+
+    def text(self):
+        return "\n".join(self.lines)
+
+
+# 文件列表模型：按列存储（路径列表 + 状态字节数组 + 大小/修改时间数组），只渲染可见行
+class PathListModel(QAbstractListModel):
+    CHECKED = 0x01
+    PINNED = 0x02
+    SOLVED = 0x04  # 无加密，已解决
+    IS_DIR = 0x08
+    STAT_UNKNOWN = -1  # 还未读取大小
+    STAT_MISSING = -2  # 文件不存在
+
+    def __init__(self, kind, size_color, format_size, parent=None):
+        super().__init__(parent)
+        self.kind = kind  # "archive" / "dict" / "ai_dict"
+        self.size_color = size_color
+        self.format_size = format_size
+        self.paths = []
+        self.path_set = set()
+        self.states = bytearray()
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.schedules = {}  # 路径 -> 调度设置（压缩文件）
+        self.metadata = {}  # 路径 -> 预扫描元数据（压缩文件）
+        self._icons = {}
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+
+    def __contains__(self, path):
+        return path in self.path_set
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def _ensure_stat(self, row):
+        """第一次需要时才读取文件大小和修改时间"""
+        if self.sizes[row] != self.STAT_UNKNOWN:
+            return
+        try:
+            st = os.stat(self.paths[row])
+        except OSError:
+            self.sizes[row] = self.STAT_MISSING
+            return
+        if S_ISDIR(st.st_mode):
+            self.states[row] |= self.IS_DIR
+            self.sizes[row] = 0
+        else:
+            self.sizes[row] = st.st_size
+        self.mtimes[row] = st.st_mtime
+
+    def _icon(self, name):
+        if name not in self._icons:
+            self._icons[name] = QIcon.fromTheme(name)
+        return self._icons[name]
+
+    def display_text(self, row):
+        path = self.paths[row]
+        if self.kind == "archive":
+            metadata = self.metadata.get(path)
+            if self.states[row] & self.SOLVED:
+                return f"{path}  [{metadata['format']}] 无加密" if metadata else f"{path}  无加密"
+            if metadata:
+                return f"{path}  [{metadata['format']}/{metadata['encryption']}]"
+            return path
+
+        name = os.path.basename(path)
+        if self.kind == "ai_dict":
+            return name
+        self._ensure_stat(row)
+        if self.states[row] & self.IS_DIR:
+            return f"{name} [目录]"
+        if self.sizes[row] == self.STAT_MISSING:
+            return f"{name} (大小未知)"
+        mtime_str = datetime.fromtimestamp(self.mtimes[row]).strftime('%Y-%m-%d %H:%M')
+        return f"{name} ({self.format_size(self.sizes[row])}, {mtime_str})"
+
+    def tooltip(self, row):
+        path = self.paths[row]
+        if self.kind != "archive":
+            return path
+        schedule = self.schedule(row)
+        tooltip = f"优先级: {schedule['priority']}  权重: {schedule['weight']}"
+        if schedule.get("deadline_minutes"):
+            tooltip += f"  截止: 开始后 {schedule['deadline_minutes']} 分钟"
+        if path in self.metadata:
+            tooltip += "\n" + describe_archive_metadata(self.metadata[path])
+        return tooltip
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.paths):
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return self.display_text(row)
+        if role == Qt.UserRole:
+            return self.paths[row]
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self.states[row] & self.CHECKED else Qt.Unchecked
+        if role == Qt.ForegroundRole:
+            if self.states[row] & self.SOLVED:
+                return QColor("#808080")
+            self._ensure_stat(row)
+            return self.size_color(max(self.sizes[row], 0))
+        if role == Qt.FontRole:
+            return self._bold_font if self.states[row] & self.PINNED else None
+        if role == Qt.DecorationRole:
+            if self.kind == "archive":
+                return self._icon("package-x-generic")
+            if self.kind == "dict":
+                self._ensure_stat(row)
+                return self._icon("folder" if self.states[row] & self.IS_DIR else "text-x-generic")
+            return None
+        if role == Qt.ToolTipRole:
+            return self.tooltip(row)
+        if role == PINNED_ROLE:
+            return bool(self.states[row] & self.PINNED)
+        if role == SCHEDULE_ROLE:
+            return self.schedule(row)
+        if role == METADATA_ROLE:
+            return self.metadata.get(self.paths[row])
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+        self._set_state(index.row(), self.CHECKED, value == Qt.Checked)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def _set_state(self, row, bit, on):
+        if on:
+            self.states[row] |= bit
+        else:
+            self.states[row] &= ~bit & 0xFF
+
+    def _rows_changed(self, rows, roles):
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)), roles)
+
+    def add_entries(self, entries):
+        """批量添加 [{"path", "checked", "pinned", "solved", "schedule", "metadata"}]，跳过已存在的路径，返回添加数"""
+        new_entries = []
+        for entry in entries:
+            path = entry.get("path")
+            if not path or path in self.path_set:
+                continue
+            self.path_set.add(path)
+            new_entries.append(entry)
+        if not new_entries:
+            return 0
+
+        first = len(self.paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_entries) - 1)
+        for entry in new_entries:
+            path = entry["path"]
+            state = 0
+            if entry.get("checked", True):
+                state |= self.CHECKED
+            if entry.get("pinned"):
+                state |= self.PINNED
+            if entry.get("solved"):
+                state |= self.SOLVED
+            self.paths.append(path)
+            self.states.append(state)
+            self.sizes.append(self.STAT_UNKNOWN)
+            self.mtimes.append(0.0)
+            if entry.get("schedule"):
+                self.schedules[path] = dict(entry["schedule"])
+            if entry.get("metadata"):
+                self.metadata[path] = entry["metadata"]
+        self.endInsertRows()
+        return len(new_entries)
+
+    def records(self):
+        """导出为配置文件/恢复信息使用的字典列表"""
+        records = []
+        for row, path in enumerate(self.paths):
+            record = {"path": path, "checked": bool(self.states[row] & self.CHECKED)}
+            if self.kind == "archive":
+                record["schedule"] = self.schedule(row)
+                # 无加密标记和预扫描结果一起保存，重启后不必重新扫描
+                if self.states[row] & self.SOLVED:
+                    record["solved"] = True
+                if path in self.metadata:
+                    record["metadata"] = self.metadata[path]
+            elif self.kind == "dict":
+                record["pinned"] = bool(self.states[row] & self.PINNED)
+            records.append(record)
+        return records
+
+    def set_records(self, records):
+        self.clear()
+        self.add_entries(records)
+
+    def clear(self):
+        self.beginResetModel()
+        self.paths = []
+        self.path_set = set()
+        self.states = bytearray()
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.schedules = {}
+        self.metadata = {}
+        self.endResetModel()
+
+    def _reorder(self, order):
+        self.paths = [self.paths[row] for row in order]
+        self.states = bytearray(self.states[row] for row in order)
+        self.sizes = array('q', (self.sizes[row] for row in order))
+        self.mtimes = array('d', (self.mtimes[row] for row in order))
+
+    def remove_rows(self, rows):
+        rows = set(rows)
+        if not rows:
+            return
+        self.beginResetModel()
+        for row in rows:
+            path = self.paths[row]
+            self.path_set.discard(path)
+            self.schedules.pop(path, None)
+            self.metadata.pop(path, None)
+        self._reorder([row for row in range(len(self.paths)) if row not in rows])
+        self.endResetModel()
+
+    def move_row(self, row, target):
+        # beginMoveRows 的目标位置是移动前的插入点
+        destination = target + 1 if target > row else target
+        if not self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), destination):
+            return False
+        for column in (self.paths, self.states, self.sizes, self.mtimes):
+            value = column.pop(row)
+            column.insert(target, value)
+        self.endMoveRows()
+        return True
+
+    def sort_by(self, by):
+        """按文件名/大小/修改时间/类型排序，只重排数组，不重建列表项"""
+        if by not in ('name_asc', 'name_desc'):
+            for row in range(len(self.paths)):
+                self._ensure_stat(row)
+        names = [os.path.basename(path).lower() for path in self.paths]
+
+        def file_type(row):
+            if self.states[row] & self.IS_DIR or self.sizes[row] == self.STAT_MISSING:
+                return 'dir'
+            return os.path.splitext(self.paths[row])[1].lower()
+
+        keys = {
+            'name_asc': lambda row: names[row],
+            'name_desc': lambda row: names[row],
+            'size_asc': lambda row: (max(self.sizes[row], 0), names[row]),
+            'size_desc': lambda row: (-max(self.sizes[row], 0), names[row]),
+            'mtime_asc': lambda row: (self.mtimes[row], names[row]),
+            'mtime_desc': lambda row: (-self.mtimes[row], names[row]),
+            'type': lambda row: (file_type(row), names[row])
+        }
+        if by not in keys:
+            return
+        order = sorted(range(len(self.paths)), key=keys[by], reverse=(by == 'name_desc'))
+        self.beginResetModel()
+        self._reorder(order)
+        self.endResetModel()
+
+    def path(self, row):
+        return self.paths[row]
+
+    def is_checked(self, row):
+        return bool(self.states[row] & self.CHECKED)
+
+    def is_pinned(self, row):
+        return bool(self.states[row] & self.PINNED)
+
+    def is_solved(self, row):
+        return bool(self.states[row] & self.SOLVED)
+
+    def checked_paths(self):
+        return [path for row, path in enumerate(self.paths) if self.states[row] & self.CHECKED]
+
+    def checked_paths_pinned_first(self):
+        """选中的路径，置顶的排在前面（字典顺序决定恢复点的序号，开始和恢复必须一致）"""
+        checked = [row for row in range(len(self.paths)) if self.states[row] & self.CHECKED]
+        return ([self.paths[row] for row in checked if self.states[row] & self.PINNED]
+                + [self.paths[row] for row in checked if not self.states[row] & self.PINNED])
+
+    def set_checked(self, rows, checked):
+        rows = list(rows)
+        for row in rows:
+            self._set_state(row, self.CHECKED, checked)
+        self._rows_changed(rows, [Qt.CheckStateRole])
+
+    def toggle_checked(self, rows):
+        for row in rows:
+            self.states[row] ^= self.CHECKED
+        self._rows_changed(rows, [Qt.CheckStateRole])
+
+    def toggle_pinned(self, rows):
+        for row in rows:
+            self.states[row] ^= self.PINNED
+        self._rows_changed(rows, [Qt.FontRole])
+
+    def schedule(self, row):
+        return self.schedules.get(self.paths[row]) or dict(DEFAULT_ARCHIVE_SCHEDULE)
+
+    def schedule_for_path(self, path):
+        return self.schedules.get(path) or dict(DEFAULT_ARCHIVE_SCHEDULE)
+
+    def set_schedule(self, rows, schedule):
+        for row in rows:
+            self.schedules[self.paths[row]] = dict(schedule)
+        self._rows_changed(rows, [Qt.ToolTipRole])
+
+
+# 文件列表视图：带筛选，对外使用的行号都是源模型的行号
+class PathListView(QListView):
+    def __init__(self, source_model, parent=None):
+        super().__init__(parent)
+        self.source = source_model
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(source_model)
+        self.proxy.setFilterRole(Qt.UserRole)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setModel(self.proxy)
+        self.setUniformItemSizes(True)  # 不逐行计算尺寸，只渲染可见行
+
+    def set_filter_text(self, text):
+        self.proxy.setFilterFixedString(text)
+
+    def selected_rows(self):
+        # 按选择区间换算，全选大列表时不逐个索引映射
+        rows = set()
+        for selection_range in self.proxy.mapSelectionToSource(self.selectionModel().selection()):
+            rows.update(range(selection_range.top(), selection_range.bottom() + 1))
+        return sorted(rows)
+
+    def current_row(self):
+        index = self.currentIndex()
+        return self.proxy.mapToSource(index).row() if index.isValid() else -1
+
+    def set_current_row(self, row):
+        self.setCurrentIndex(self.proxy.mapFromSource(self.source.index(row)))
+
+    def move_current(self, offset):
+        """当前行上移(-1)或下移(+1)"""
+        row = self.current_row()
+        target = row + offset
+        if row < 0 or not 0 <= target < self.source.rowCount():
+            return
+        if self.source.move_row(row, target):
+            self.set_current_row(target)
 
 
 class PasswordCrackerGUI(QMainWindow):
@@ -462,9 +3567,21 @@ class PasswordCrackerGUI(QMainWindow):
         self.settings = QSettings("7zCracker", "PasswordCracker")
         self.config_file = "cracker_config.json"
         self.password_log_file = "found_passwords.log"
+        self.password_log = PasswordLog(self.password_log_file)
         self.resume_file = "cracker_resume.json"
+        self.status_log_file = "cracker_status.log"
+        self.journal = CheckpointJournal("cracker_resume.journal")
+        self.job_config = None  # 当前任务开始时的配置，保存恢复信息时使用
+        self.scheduler = None
+        self.async_verifier = None
+        self.archive_pins = ArchivePinCache()
         self.max_threads = os.cpu_count() or 4
         self.ai_generator = AIPasswordGenerator()
+        self.rule_engine = None
+        self.archive_scan_thread = None
+        self.known_plaintext_thread = None
+        self.session_hits = []  # 本次运行中找到的密码，最近的在前
+        self.archive_import_counts = defaultdict(int)
 
         # 添加这行初始化代码
         self.recursive_check = QCheckBox("递归搜索目录中的字典文件")
@@ -483,90 +3600,17 @@ class PasswordCrackerGUI(QMainWindow):
         self.update_timer.start(1000)
 
     def move_ai_dict_item_up(self):
-        current_row = self.ai_dict_list.currentRow()
-        if current_row > 0:
-            item = self.ai_dict_list.takeItem(current_row)
-            self.ai_dict_list.insertItem(current_row - 1, item)
-            self.ai_dict_list.setCurrentRow(current_row - 1)
+        self.ai_dict_list.move_current(-1)
 
     def move_ai_dict_item_down(self):
-        current_row = self.ai_dict_list.currentRow()
-        if current_row < self.ai_dict_list.count() - 1:
-            item = self.ai_dict_list.takeItem(current_row)
-            self.ai_dict_list.insertItem(current_row + 1, item)
-            self.ai_dict_list.setCurrentRow(current_row + 1)
+        self.ai_dict_list.move_current(1)
 
     def toggle_ai_dict_item_selection(self):
-        for item in self.ai_dict_list.selectedItems():
-            if item.checkState() == Qt.Checked:
-                item.setCheckState(Qt.Unchecked)
-            else:
-                item.setCheckState(Qt.Checked)
+        self.ai_dict_model.toggle_checked(self.ai_dict_list.selected_rows())
 
     def sort_ai_dict_items(self, by='name_asc'):
         """按指定方式排序AI字典列表"""
-        items = []
-        for i in range(self.ai_dict_list.count()):
-            item = self.ai_dict_list.item(i)
-            path = item.data(Qt.UserRole)
-            checked = item.checkState() == Qt.Checked
-            
-            # 获取文件信息
-            file_info = {
-                'item': item,
-                'path': path,
-                'name': os.path.basename(path),
-                'checked': checked,
-                'size': 0,
-                'mtime': 0,
-                'type': os.path.splitext(path)[1].lower() if os.path.isfile(path) else 'dir'
-            }
-            
-            if os.path.isfile(path):
-                try:
-                    stat = os.stat(path)
-                    file_info['size'] = stat.st_size
-                    file_info['mtime'] = stat.st_mtime
-                except:
-                    pass
-            
-            items.append(file_info)
-        
-        # 根据排序方式排序
-        if by == 'name_asc':
-            items.sort(key=lambda x: x['name'].lower())
-        elif by == 'name_desc':
-            items.sort(key=lambda x: x['name'].lower(), reverse=True)
-        elif by == 'size_asc':
-            items.sort(key=lambda x: (x['size'], x['name'].lower()))
-        elif by == 'size_desc':
-            items.sort(key=lambda x: (-x['size'], x['name'].lower()))
-        elif by == 'mtime_asc':
-            items.sort(key=lambda x: (x['mtime'], x['name'].lower()))
-        elif by == 'mtime_desc':
-            items.sort(key=lambda x: (-x['mtime'], x['name'].lower()))
-        elif by == 'type':
-            items.sort(key=lambda x: (x['type'], x['name'].lower()))
-        
-        # 重新添加项目
-        self.ai_dict_list.clear()
-        for item_data in items:
-            path = item_data['path']
-            item = QListWidgetItem(os.path.basename(path))
-            item.setData(Qt.UserRole, path)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked if item_data['checked'] else Qt.Unchecked)
-            
-            # 设置颜色
-            try:
-                size = os.path.getsize(path)
-                color = self.get_size_color(size)
-                item.setForeground(color)
-            except:
-                pass
-                
-            self.ai_dict_list.addItem(item)
-
+        self.ai_dict_model.sort_by(by)
 
     def show_ai_dict_context_menu(self, pos):
         """显示AI字典列表的右键菜单"""
@@ -636,66 +3680,20 @@ class PasswordCrackerGUI(QMainWindow):
         menu.exec_(self.ai_dict_list.mapToGlobal(pos))
 
 
-    def sort_ai_dict_items(self, by='name'):
-        """排序AI字典列表"""
-        items = []
-        for i in range(self.ai_dict_list.count()):
-            item = self.ai_dict_list.item(i)
-            path = item.data(Qt.UserRole)
-            items.append({
-                'item': item,
-                'path': path,
-                'name': os.path.basename(path)
-            })
-        
-        if by == 'name':
-            items.sort(key=lambda x: x['name'].lower())
-        elif by == 'name_desc':
-            items.sort(key=lambda x: x['name'].lower(), reverse=True)
-        
-        self.ai_dict_list.clear()
-        for item_data in items:
-            item = item_data['item']
-            path = item_data['path']
-            
-            new_item = QListWidgetItem(os.path.basename(path))
-            new_item.setData(Qt.UserRole, path)
-            self.ai_dict_list.addItem(new_item)
-
     def remove_selected_ai_dicts(self):
         """移除选中的AI字典"""
-        for item in self.ai_dict_list.selectedItems():
-            self.ai_dict_list.takeItem(self.ai_dict_list.row(item))
+        self.ai_dict_model.remove_rows(self.ai_dict_list.selected_rows())
 
     def clear_ai_dict_list(self):
         """清空AI字典列表"""
-        self.ai_dict_list.clear()
+        self.ai_dict_model.clear()
 
     def add_ai_dict_files(self):
         """添加字典文件到AI学习列表"""
         file_paths, _ = QFileDialog.getOpenFileNames(
             self, "选择字典文件", "",
             "文本文件 (*.txt *.dic *.lst);;所有文件 (*.*)")
-            
-        for file_path in file_paths:
-            if not any(self.ai_dict_list.item(i).data(Qt.UserRole) == file_path 
-                    for i in range(self.ai_dict_list.count())):
-                item = QListWidgetItem(os.path.basename(file_path))
-                item.setData(Qt.UserRole, file_path)
-                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                item.setCheckState(Qt.Checked)  # 默认选中
-                
-                # 设置颜色
-                try:
-                    size = os.path.getsize(file_path)
-                    color = self.get_size_color(size)
-                    item.setForeground(color)
-                except:
-                    pass
-                    
-                self.ai_dict_list.addItem(item)
-
-
+        self.ai_dict_model.add_entries([{"path": file_path} for file_path in file_paths])
 
     def init_ai_learning_ui(self):
         """初始化AI学习相关UI"""
@@ -722,18 +3720,15 @@ class PasswordCrackerGUI(QMainWindow):
         self.ai_dict_group = QGroupBox("选择学习字典")
         self.ai_dict_layout = QVBoxLayout()
         
-        # 改为使用 QListWidget 并启用复选框
-        self.ai_dict_list = QListWidget()
-        self.ai_dict_list.setSelectionMode(QAbstractItemView.MultiSelection)
+        # 模型/视图列表，带复选框
+        self.ai_dict_model = PathListModel("ai_dict", self.get_size_color, self.format_file_size, self)
+        self.ai_dict_list = PathListView(self.ai_dict_model)
+        self.ai_dict_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.ai_dict_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.ai_dict_list.customContextMenuRequested.connect(self.show_ai_dict_context_menu)
-
-        # 设置项目为可选
-        self.ai_dict_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
-        for i in range(self.ai_dict_list.count()):
-            item = self.ai_dict_list.item(i)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked)  # 默认选中
+        self.ai_dict_filter_edit = QLineEdit()
+        self.ai_dict_filter_edit.setPlaceholderText("筛选...")
+        self.ai_dict_filter_edit.textChanged.connect(self.ai_dict_list.set_filter_text)
 
         # 添加按钮
         ai_dict_btn_layout = QHBoxLayout()
@@ -754,6 +3749,7 @@ class PasswordCrackerGUI(QMainWindow):
         ai_dict_btn_layout.addWidget(self.ai_select_all_btn)
         ai_dict_btn_layout.addWidget(self.ai_select_none_btn)
         
+        self.ai_dict_layout.addWidget(self.ai_dict_filter_edit)
         self.ai_dict_layout.addWidget(self.ai_dict_list)
         self.ai_dict_layout.addLayout(ai_dict_btn_layout)
         self.ai_dict_group.setLayout(self.ai_dict_layout)
@@ -792,11 +3788,7 @@ class PasswordCrackerGUI(QMainWindow):
     def start_ai_learning(self):
         """开始AI学习并生成密码"""
         # 获取选中的字典文件（只包括被勾选的）
-        selected_items = []
-        for i in range(self.ai_dict_list.count()):
-            item = self.ai_dict_list.item(i)
-            if item.checkState() == Qt.Checked:
-                selected_items.append(item.data(Qt.UserRole))
+        selected_items = self.ai_dict_model.checked_paths()
                          
         if not selected_items:
             QMessageBox.warning(self, "警告", "请选择至少一个字典文件")
@@ -806,16 +3798,28 @@ class PasswordCrackerGUI(QMainWindow):
         if count <= 0:
             count = None  # 无限制
             
+        # 先选择输出文件，生成时直接流式写入
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        default_path = f"ai_passwords_{timestamp}.txt"
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "保存生成的密码", default_path,
+            "文本文件 (*.txt);;所有文件 (*.*)")
+        if not file_path:
+            return
+            
         # 创建并启动学习线程
         self.ai_learning_thread = AILearningThread(
             selected_items, 
             self.ai_generator,
-            count or 1000000  # 设置一个大数作为"无限制"
+            file_path,
+            count or 1000000,  # 设置一个大数作为"无限制"
+            seven_zip_path=self.sevenz_path_edit.text() or "7z.exe"
         )
         
         self.ai_learning_thread.progress_updated.connect(self.update_ai_progress)
         self.ai_learning_thread.learning_finished.connect(self.ai_learning_finished)
-        self.ai_learning_thread.passwords_generated.connect(self.save_generated_passwords)
+        self.ai_learning_thread.passwords_saved.connect(self.save_generated_passwords)
         
         self.ai_progress_bar.setVisible(True)
         self.ai_progress_bar.setValue(0)
@@ -837,52 +3841,9 @@ class PasswordCrackerGUI(QMainWindow):
         else:
             QMessageBox.warning(self, "错误", message)
             
-    def save_generated_passwords(self, passwords):
-        """保存生成的密码到文件"""
-        if not passwords:
-            return
-            
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_path = f"ai_passwords_{timestamp}.txt"
-        
-        file_path, _ = QFileDialog.getSaveFileName(
-            self, "保存生成的密码", default_path,
-            "文本文件 (*.txt);;所有文件 (*.*)")
-            
-        if file_path:
-            try:
-                # 读取现有文件内容(如果存在)以避免重复
-                existing = set()
-                if os.path.exists(file_path):
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        existing.update(line.strip() for line in f if line.strip())
-                
-                # 添加新密码并去重
-                existing.update(passwords)
-                
-                # 写入文件
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write("\n".join(existing))
-                    
-                self.status_display.append(f"已保存 {len(existing)} 个密码到 {file_path}")
-            except Exception as e:
-                QMessageBox.warning(self, "错误", f"保存密码文件失败: {str(e)}")
-
-    def add_ai_dict_files(self):
-        """添加字典文件到AI学习列表"""
-        file_paths, _ = QFileDialog.getOpenFileNames(
-            self, "选择字典文件", "",
-            "文本文件 (*.txt *.dic *.lst);;所有文件 (*.*)")
-            
-        for file_path in file_paths:
-            if not any(self.ai_dict_list.item(i).data(Qt.UserRole) == file_path 
-                    for i in range(self.ai_dict_list.count())):
-                item = QListWidgetItem(os.path.basename(file_path))
-                item.setData(Qt.UserRole, file_path)
-                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                item.setCheckState(Qt.Checked)  # 默认选中
-                self.ai_dict_list.addItem(item)
-
+    def save_generated_passwords(self, file_path, count):
+        """生成的密码已由学习线程流式写入文件，这里只报告结果"""
+        self.status_log.append(f"已追加 {count} 个新密码到 {file_path}")
 
     def format_file_size(self, size):
         """格式化文件大小为易读的字符串"""
@@ -908,6 +3869,10 @@ class PasswordCrackerGUI(QMainWindow):
         return QColor.fromHslF(hue / 360, saturation, lightness)
 
 
+    def update_total(self, archive_path, total):
+        """破解线程统计完候选总数后报告"""
+        self.status_log.append(f"{os.path.basename(archive_path)}: 候选总数 {total:,}")
+
     def update_progress_info(self, progress, tried, total):
         """更新详细的进度信息"""
         if not hasattr(self, 'start_time'):
@@ -973,10 +3938,97 @@ class PasswordCrackerGUI(QMainWindow):
         self.thread_spin.setCurrentIndex(self.max_threads - 1)
         performance_layout.addWidget(self.thread_label)
         performance_layout.addWidget(self.thread_spin)
+        self.priority_check = QCheckBox("优先尝试历史密码")
+        self.priority_check.setToolTip("开始破解前先尝试密码日志中已找到过的密码，置顶的字典优先处理")
+        self.priority_check.setChecked(True)
+        performance_layout.addWidget(self.priority_check)
+        self.log_to_file_check = QCheckBox("状态日志写入文件")
+        self.log_to_file_check.setToolTip("状态信息同时写入 cracker_status.log，超过10MB自动轮转，保留5个备份")
+        performance_layout.addWidget(self.log_to_file_check)
+        self.async_verify_check = QCheckBox("异步验证")
+        self.async_verify_check.setToolTip("7z/unrar 验证由单个事件循环线程驱动，可同时运行数百个验证进程")
+        self.async_concurrency_spin = QSpinBox()
+        self.async_concurrency_spin.setRange(1, 1024)
+        self.async_concurrency_spin.setValue(64)
+        self.async_concurrency_spin.setToolTip("异步验证时同时运行的外部进程数（所有压缩文件共享）")
+        performance_layout.addWidget(self.async_verify_check)
+        performance_layout.addWidget(self.async_concurrency_spin)
+        self.pin_archives_check = QCheckBox("压缩文件载入内存")
+        self.pin_archives_check.setToolTip("破解前将压缩文件复制到内存文件系统（无则为本地临时目录），"
+                                           "避免每次验证都从磁盘或网络读取，破解结束后自动删除（单个不超过1GB）")
+        performance_layout.addWidget(self.pin_archives_check)
         performance_layout.addStretch()
         performance_group.setLayout(performance_layout)
         basic_layout.addWidget(performance_group)
 
+        # 规则设置组
+        rules_group = QGroupBox("规则变换")
+        rules_layout = QHBoxLayout()
+        self.rules_enable_check = QCheckBox("启用规则")
+        self.rules_enable_check.setToolTip("对字典中的每个单词应用hashcat/John规则，生成变体密码")
+        self.rules_path_edit = QLineEdit()
+        self.rules_path_edit.setPlaceholderText("规则文件路径 (留空使用内置规则)")
+        browse_rules_btn = QPushButton("浏览...")
+        browse_rules_btn.clicked.connect(self.browse_rules)
+        rules_layout.addWidget(self.rules_enable_check)
+        rules_layout.addWidget(self.rules_path_edit)
+        rules_layout.addWidget(browse_rules_btn)
+        rules_group.setLayout(rules_layout)
+        basic_layout.addWidget(rules_group)
+
+        # 掩码/混合/组合攻击设置组
+        mask_group = QGroupBox("掩码/混合攻击")
+        mask_group_layout = QVBoxLayout()
+        mask_layout = QHBoxLayout()
+        self.mask_enable_check = QCheckBox("启用")
+        self.mask_enable_check.setToolTip("?l小写 ?u大写 ?d数字 ?s符号 ?a全部 ?1/?2自定义字符集, 例如 ?d?d?1?1")
+        self.mask_edit = QLineEdit()
+        self.mask_edit.setPlaceholderText("掩码, 例如 ?d?d?u?u")
+        self.mask_charset1_edit = QLineEdit()
+        self.mask_charset1_edit.setPlaceholderText("?1 字符集, 例如 ?l?u")
+        self.mask_charset2_edit = QLineEdit()
+        self.mask_charset2_edit.setPlaceholderText("?2 字符集")
+        self.mask_increment_check = QCheckBox("增量长度")
+        self.mask_min_length_spin = QSpinBox()
+        self.mask_min_length_spin.setRange(1, 64)
+        self.mask_keyspace_label = QLabel("候选数: 0")
+        for widget in (self.mask_edit, self.mask_charset1_edit, self.mask_charset2_edit):
+            widget.textChanged.connect(self.update_mask_keyspace)
+        self.mask_increment_check.toggled.connect(self.update_mask_keyspace)
+        self.mask_min_length_spin.valueChanged.connect(self.update_mask_keyspace)
+        mask_layout.addWidget(self.mask_enable_check)
+        mask_layout.addWidget(self.mask_edit, 2)
+        mask_layout.addWidget(self.mask_charset1_edit, 1)
+        mask_layout.addWidget(self.mask_charset2_edit, 1)
+        mask_layout.addWidget(self.mask_increment_check)
+        mask_layout.addWidget(self.mask_min_length_spin)
+        mask_layout.addWidget(self.mask_keyspace_label)
+
+        hybrid_layout = QHBoxLayout()
+        self.attack_mode_combo = QComboBox()
+        for mode, text in (('mask', "掩码"), ('word_mask', "字典+掩码"),
+                           ('mask_word', "掩码+字典"), ('combinator', "组合(左字典+右字典)")):
+            self.attack_mode_combo.addItem(text, mode)
+        self.hybrid_left_edit = QLineEdit()
+        self.hybrid_left_edit.setPlaceholderText("混合/组合使用的字典 (左)")
+        browse_left_btn = QPushButton("浏览...")
+        browse_left_btn.clicked.connect(lambda: self.browse_wordlist(self.hybrid_left_edit))
+        self.hybrid_right_edit = QLineEdit()
+        self.hybrid_right_edit.setPlaceholderText("组合使用的字典 (右)")
+        browse_right_btn = QPushButton("浏览...")
+        browse_right_btn.clicked.connect(lambda: self.browse_wordlist(self.hybrid_right_edit))
+        hybrid_layout.addWidget(QLabel("模式:"))
+        hybrid_layout.addWidget(self.attack_mode_combo)
+        hybrid_layout.addWidget(self.hybrid_left_edit, 1)
+        hybrid_layout.addWidget(browse_left_btn)
+        hybrid_layout.addWidget(self.hybrid_right_edit, 1)
+        hybrid_layout.addWidget(browse_right_btn)
+
+        mask_group_layout.addLayout(mask_layout)
+        mask_group_layout.addLayout(hybrid_layout)
+        mask_group.setLayout(mask_group_layout)
+        basic_layout.addWidget(mask_group)
+
         basic_tab.setLayout(basic_layout)
         tab_widget.addTab(basic_tab, "基本设置")
 
@@ -1013,11 +4065,15 @@ class PasswordCrackerGUI(QMainWindow):
         # ------ 压缩文件列表 ------
         archive_group = QGroupBox("压缩文件列表 (支持拖放)")
         archive_layout = QVBoxLayout()
-        self.archive_list = QListWidget()
+        self.archive_model = PathListModel("archive", self.get_size_color, self.format_file_size, self)
+        self.archive_list = PathListView(self.archive_model)
         self.archive_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.archive_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.archive_list.customContextMenuRequested.connect(self.show_archive_list_context_menu)
         self.archive_list.setAcceptDrops(True)  # 启用拖放功能
+        self.archive_filter_edit = QLineEdit()
+        self.archive_filter_edit.setPlaceholderText("筛选...")
+        self.archive_filter_edit.textChanged.connect(self.archive_list.set_filter_text)
         
         # 压缩文件操作按钮
         archive_button_layout = QHBoxLayout()
@@ -1041,6 +4097,7 @@ class PasswordCrackerGUI(QMainWindow):
         archive_button_layout.addWidget(select_all_archive_btn)
         archive_button_layout.addWidget(select_none_archive_btn)
         
+        archive_layout.addWidget(self.archive_filter_edit)
         archive_layout.addWidget(self.archive_list)
         archive_layout.addLayout(archive_button_layout)
         archive_group.setLayout(archive_layout)
@@ -1049,13 +4106,15 @@ class PasswordCrackerGUI(QMainWindow):
         # ------ 字典文件列表 ------
         dict_group = QGroupBox("字典管理 (支持拖放)")
         dict_layout = QVBoxLayout()
-        self.dict_list = QListWidget()
+        self.dict_model = PathListModel("dict", self.get_size_color, self.format_file_size, self)
+        self.dict_list = PathListView(self.dict_model)
         self.dict_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.dict_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.dict_list.customContextMenuRequested.connect(self.show_dict_list_context_menu)
-        self.dict_list.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.dict_list.customContextMenuRequested.connect(self.show_dict_list_context_menu)
         self.dict_list.setAcceptDrops(True)  # 启用拖放功能
+        self.dict_filter_edit = QLineEdit()
+        self.dict_filter_edit.setPlaceholderText("筛选...")
+        self.dict_filter_edit.textChanged.connect(self.dict_list.set_filter_text)
         
         # 字典操作按钮
         dict_button_layout = QHBoxLayout()
@@ -1098,6 +4157,7 @@ class PasswordCrackerGUI(QMainWindow):
             """)
             legend_layout.addWidget(label)
         
+        dict_layout.addWidget(self.dict_filter_edit)
         dict_layout.addWidget(self.dict_list)
         dict_layout.addLayout(dict_button_layout)
         dict_layout.addLayout(legend_layout)
@@ -1150,7 +4210,7 @@ class PasswordCrackerGUI(QMainWindow):
         self.stop_btn.setEnabled(False)
         self.resume_btn = QPushButton("恢复破解")
         self.resume_btn.clicked.connect(self.resume_cracking)
-        self.resume_btn.setEnabled(os.path.exists(self.resume_file))
+        self.resume_btn.setEnabled(self.has_resume_data())
         
         action_btn_layout.addWidget(self.start_all_btn)
         action_btn_layout.addWidget(self.start_selected_btn)
@@ -1174,15 +4234,38 @@ class PasswordCrackerGUI(QMainWindow):
         control_layout.addLayout(config_btn_layout)
 
         # 状态信息显示区域
-        self.status_display = QTextEdit()
+        self.status_display = QPlainTextEdit()
         self.status_display.setReadOnly(True)
         self.status_display.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #f8f8f8;
                 border: 1px solid #ddd;
                 border-radius: 3px;
             }
         """)
+        self.status_log = StatusLog(self.status_display)
+
+        # 破解结果面板（非模态，命中不打断其他任务）
+        results_group = QGroupBox("破解结果")
+        results_layout = QVBoxLayout()
+        self.results_table = QTableWidget(0, 3)
+        self.results_table.setHorizontalHeaderLabels(["时间", "压缩文件", "密码"])
+        self.results_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.results_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.results_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        results_btn_layout = QHBoxLayout()
+        copy_result_btn = QPushButton("复制密码")
+        copy_result_btn.clicked.connect(self.copy_selected_result)
+        save_result_btn = QPushButton("保存到字典")
+        save_result_btn.clicked.connect(self.save_selected_result)
+        results_btn_layout.addWidget(copy_result_btn)
+        results_btn_layout.addWidget(save_result_btn)
+        results_btn_layout.addStretch()
+        results_layout.addWidget(self.results_table)
+        results_layout.addLayout(results_btn_layout)
+        results_group.setLayout(results_layout)
+        self.log_to_file_check.toggled.connect(
+            lambda checked: self.status_log.set_log_file(self.status_log_file if checked else None))
 
         # 将控件添加到下部布局
         bottom_layout.addWidget(self.active_tasks_label)
@@ -1192,6 +4275,7 @@ class PasswordCrackerGUI(QMainWindow):
         bottom_layout.addWidget(self.current_dict_label)
         bottom_layout.addLayout(control_layout)
         bottom_layout.addWidget(self.status_display)
+        bottom_layout.addWidget(results_group)
 
         bottom_panel.setLayout(bottom_layout)
         splitter.addWidget(bottom_panel)
@@ -1212,22 +4296,15 @@ class PasswordCrackerGUI(QMainWindow):
 
     def toggle_all_archive_items(self, checked):
         """切换所有压缩文件的选择状态"""
-        for i in range(self.archive_list.count()):
-            item = self.archive_list.item(i)
-            item.setCheckState(Qt.Checked if checked else Qt.Unchecked)
+        self.archive_model.set_checked(range(self.archive_model.rowCount()), checked)
 
     def toggle_all_dict_items(self, checked):
         """切换所有字典的选择状态"""
-        for i in range(self.dict_list.count()):
-            item = self.dict_list.item(i)
-            item.setCheckState(Qt.Checked if checked else Qt.Unchecked)
+        self.dict_model.set_checked(range(self.dict_model.rowCount()), checked)
 
     def toggle_all_ai_dict_items(self, checked):
         """切换所有AI字典的选择状态"""
-        for i in range(self.ai_dict_list.count()):
-            item = self.ai_dict_list.item(i)
-            item.setCheckState(Qt.Checked if checked else Qt.Unchecked)
-
+        self.ai_dict_model.set_checked(range(self.ai_dict_model.rowCount()), checked)
 
     def browse_sevenz(self):
         file_path, _ = QFileDialog.getOpenFileName(
@@ -1235,6 +4312,81 @@ class PasswordCrackerGUI(QMainWindow):
         if file_path:
             self.sevenz_path_edit.setText(file_path)
 
+    def browse_rules(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择规则文件", "", "规则文件 (*.rule *.rules *.txt);;所有文件 (*.*)")
+        if file_path:
+            self.rules_path_edit.setText(file_path)
+
+    def create_rule_engine(self):
+        """根据界面设置创建规则引擎，未启用时返回None"""
+        if not self.rules_enable_check.isChecked():
+            return None
+        rules_path = self.rules_path_edit.text()
+        try:
+            engine = RuleEngine.from_file(rules_path) if rules_path else RuleEngine()
+        except Exception as e:
+            self.status_log.append(f"加载规则文件失败: {str(e)}")
+            return None
+        self.status_log.append(f"已加载 {len(engine)} 条规则")
+        return engine
+
+    def create_mask_generator(self, show_errors=True):
+        """根据界面设置创建掩码生成器，未启用或掩码无效时返回None"""
+        mask = self.mask_edit.text()
+        if not mask:
+            return None
+        try:
+            return MaskGenerator(
+                mask,
+                {'1': self.mask_charset1_edit.text(), '2': self.mask_charset2_edit.text()},
+                min_length=self.mask_min_length_spin.value() if self.mask_increment_check.isChecked() else None
+            )
+        except ValueError as e:
+            if show_errors:
+                self.status_log.append(f"掩码无效: {str(e)}")
+            return None
+
+    def update_mask_keyspace(self):
+        mask_generator = self.create_mask_generator(show_errors=False)
+        keyspace = mask_generator.keyspace if mask_generator else 0
+        self.mask_keyspace_label.setText(f"候选数: {keyspace:,}")
+
+    def browse_wordlist(self, line_edit):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "选择字典文件", "", "文本文件 (*.txt *.dic *.lst);;所有文件 (*.*)")
+        if file_path:
+            line_edit.setText(file_path)
+
+    def create_candidate_generator(self):
+        """根据攻击模式创建掩码/混合/组合候选生成器，设置无效时返回None"""
+        mode = self.attack_mode_combo.currentData()
+        left_path = self.hybrid_left_edit.text()
+        right_path = self.hybrid_right_edit.text()
+
+        if mode in ('word_mask', 'mask_word', 'combinator') and not os.path.isfile(left_path):
+            self.status_log.append(f"混合/组合字典不存在: {left_path}")
+            return None
+        if mode == 'combinator':
+            if not os.path.isfile(right_path):
+                self.status_log.append(f"组合字典不存在: {right_path}")
+                return None
+            return CombinatorGenerator(WordListSource(left_path), WordListSource(right_path))
+
+        mask_generator = self.create_mask_generator()
+        if not mask_generator or mode == 'mask':
+            return mask_generator
+        return HybridGenerator(WordListSource(left_path), mask_generator,
+                               mask_first=(mode == 'mask_word'))
+
+    def report_rule_stats(self):
+        """输出规则命中统计"""
+        if not self.rule_engine:
+            return
+        hit_rules = [(text, generated, hits) for text, generated, hits in self.rule_engine.stats() if hits]
+        for text, generated, hits in hit_rules:
+            self.status_log.append(f"规则 {text}: 生成 {generated}, 命中 {hits}")
+
 
     def add_to_dictionary(self, password):
         """将密码添加到用户选择的字典文件"""
@@ -1242,9 +4394,7 @@ class PasswordCrackerGUI(QMainWindow):
             return
         
         # 让用户选择要添加到的字典文件
-        dict_files = [self.dict_list.item(i).data(Qt.UserRole) 
-                    for i in range(self.dict_list.count())
-                    if os.path.isfile(self.dict_list.item(i).data(Qt.UserRole))]
+        dict_files = [path for path in self.dict_model.paths if os.path.isfile(path)]
         
         if not dict_files:
             QMessageBox.warning(self, "警告", "没有可用的字典文件")
@@ -1259,51 +4409,101 @@ class PasswordCrackerGUI(QMainWindow):
             try:
                 with open(full_path, 'a', encoding='utf-8') as f:
                     f.write(f"{password}\n")
-                self.status_display.append(f"密码已添加到字典: {os.path.basename(full_path)}")
+                self.status_log.append(f"密码已添加到字典: {os.path.basename(full_path)}")
             except Exception as e:
-                self.status_display.append(f"添加到字典失败: {str(e)}")
+                self.status_log.append(f"添加到字典失败: {str(e)}")
 
 
     def add_archive_file(self):
         file_paths, _ = QFileDialog.getOpenFileNames(
             self, "选择压缩文件", "", 
             "7z支持的所有格式 (*.7z *.zip *.rar *.tar *.gz *.bz2 *.xz *.cab *.arj *.z *.lzh *.iso);;所有文件 (*.*)")
-        for file_path in file_paths:
-            self.add_archive_item(file_path)
+        file_paths = [path for path in file_paths if path]
+        if file_paths:
+            self.start_archive_scan(file_paths=file_paths)
 
     def add_archive_dir(self):
         dir_path = QFileDialog.getExistingDirectory(
             self, "选择压缩文件目录", "",
             QFileDialog.ShowDirsOnly | QFileDialog.DontResolveSymlinks)
         if dir_path:
-            for root, _, files in os.walk(dir_path):
-                for file in files:
-                    if file.lower().endswith(('.7z', '.zip', '.rar', '.tar', '.gz', '.bz2', '.xz', '.cab', '.arj', '.z', '.lzh', '.iso')):
-                        file_path = os.path.join(root, file)
-                        self.add_archive_item(file_path)
+            self.start_archive_scan(dir_path=dir_path)
 
-    def add_archive_item(self, path):
-        if not path:
+    def start_archive_scan(self, dir_path=None, file_paths=None):
+        """后台遍历和预扫描，分批加入列表，界面保持响应（选择的文件和目录都走这里）"""
+        if self.archive_scan_thread and self.archive_scan_thread.isRunning():
+            QMessageBox.warning(self, "警告", "上一批压缩文件仍在导入中")
             return
-            
-        # 检查是否已存在
-        for i in range(self.archive_list.count()):
-            if self.archive_list.item(i).data(Qt.UserRole) == path:
-                return
-                
-        item = QListWidgetItem(path)
-        item.setData(Qt.UserRole, path)  # 存储完整路径
-        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-        item.setCheckState(Qt.Checked)
-        item.setIcon(QIcon.fromTheme("package-x-generic"))
-        self.archive_list.addItem(item)
+
+        self.archive_import_counts = defaultdict(int)
+        self.archive_scan_thread = ArchiveScanThread(
+            dir_path, self.sevenz_path_edit.text() or "7z.exe", set(self.archive_model.paths),
+            file_paths=file_paths)
+        self.archive_scan_thread.batch_ready.connect(self.add_archive_batch)
+        self.archive_scan_thread.progress_updated.connect(
+            lambda walked, scanned: self.statusBar().showMessage(
+                f"正在导入: 已遍历 {walked} 个文件, 已扫描 {scanned} 个压缩文件"))
+        self.archive_scan_thread.scan_finished.connect(self.archive_scan_finished)
+        self.archive_scan_thread.start()
+        self.update_status(f"开始导入目录: {dir_path}" if dir_path else f"开始导入 {len(file_paths)} 个文件")
+
+    def add_archive_batch(self, batch):
+        """加入一批已预扫描的压缩文件"""
+        for classification, count in self.add_archive_items(batch).items():
+            self.archive_import_counts[classification] += count
+
+    def archive_scan_finished(self, scanned, error):
+        self.statusBar().clearMessage()
+        if error:
+            self.update_status(f"导入压缩文件失败: {error}")
+        self.report_archive_import(scanned, self.archive_import_counts)
+
+    def report_archive_import(self, total, counts):
+        self.update_status(
+            f"预扫描 {total} 个文件: 加密 {counts['encrypted']} 个, "
+            f"无加密(已标记为已解决) {counts['unencrypted']} 个, 不支持加密已跳过 {counts['unsupported']} 个")
+
+    def add_archive_items(self, pairs):
+        """加入一批 (路径, 元数据)，返回 {预扫描分类: 数量}；已存在的路径不计数"""
+        counts = defaultdict(int)
+        entries = []
+        solved_paths = []
+        seen = set()
+        for path, metadata in pairs:
+            if not path or path in self.archive_model or path in seen:
+                continue
+            seen.add(path)
+            if metadata is None:
+                metadata = scan_archive_metadata(path, self.sevenz_path_edit.text() or "7z.exe")
+            classification = classify_archive(metadata)
+            counts[classification] += 1
+            if classification == "unsupported":
+                continue
+
+            solved = classification == "unencrypted"
+            entries.append({"path": path, "checked": not solved, "solved": solved, "metadata": metadata})
+            if solved:
+                solved_paths.append(path)
+        if solved_paths:
+            # 无需密码：记录空密码，已解决状态保存在列表中，不参与破解；整批只落盘一次
+            # 检查点日志只在任务开始后写入，否则导入文件就会让“恢复”按钮可用
+            try:
+                self.password_log.record_many([(path, "") for path in solved_paths])
+            except Exception as e:
+                self.status_log.append(f"记录密码失败: {str(e)}")
+        self.archive_model.add_entries(entries)
+        return counts
+
+    def add_archive_item(self, path, metadata=None):
+        """加入压缩文件列表，返回预扫描分类（已存在时返回None）"""
+        counts = self.add_archive_items([(path, metadata)])
+        return next(iter(counts), None)
 
     def remove_selected_archives(self):
-        for item in self.archive_list.selectedItems():
-            self.archive_list.takeItem(self.archive_list.row(item))
+        self.archive_model.remove_rows(self.archive_list.selected_rows())
 
     def clear_archive_list(self):
-        self.archive_list.clear()
+        self.archive_model.clear()
 
     def show_archive_list_context_menu(self, pos):
         menu = QMenu()
@@ -1322,6 +4522,14 @@ class PasswordCrackerGUI(QMainWindow):
         toggle_action.triggered.connect(self.toggle_archive_item_selection)
         menu.addAction(toggle_action)
         
+        schedule_action = QAction("调度设置(优先级/权重/截止时间)...", self)
+        schedule_action.triggered.connect(self.edit_archive_schedule)
+        menu.addAction(schedule_action)
+
+        known_plaintext_action = QAction("已知明文攻击(ZipCrypto)...", self)
+        known_plaintext_action.triggered.connect(self.start_known_plaintext_attack)
+        menu.addAction(known_plaintext_action)
+        
         menu.addSeparator()
         
         remove_action = QAction("移除", self)
@@ -1330,33 +4538,167 @@ class PasswordCrackerGUI(QMainWindow):
         
         menu.exec_(self.archive_list.mapToGlobal(pos))
 
+    def edit_archive_schedule(self):
+        rows = self.archive_list.selected_rows()
+        if not rows:
+            return
+        schedule = self.archive_model.schedule(rows[0])
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("调度设置")
+        form = QFormLayout()
+        priority_spin = QSpinBox()
+        priority_spin.setRange(-100, 100)
+        priority_spin.setValue(schedule["priority"])
+        priority_spin.setToolTip("优先级高的压缩文件优先获得工作线程")
+        weight_spin = QSpinBox()
+        weight_spin.setRange(1, 100)
+        weight_spin.setValue(schedule["weight"])
+        weight_spin.setToolTip("同一优先级下按权重比例分配工作线程")
+        deadline_spin = QSpinBox()
+        deadline_spin.setRange(0, 100000)
+        deadline_spin.setValue(schedule.get("deadline_minutes", 0))
+        deadline_spin.setSpecialValueText("无")
+        deadline_spin.setToolTip("开始后多少分钟内需要完成，截止时间早的优先调度")
+        form.addRow("优先级:", priority_spin)
+        form.addRow("权重:", weight_spin)
+        form.addRow("截止时间(分钟):", deadline_spin)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        form.addRow(buttons)
+        dialog.setLayout(form)
+
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        schedule = {
+            "priority": priority_spin.value(),
+            "weight": weight_spin.value(),
+            "deadline_minutes": deadline_spin.value()
+        }
+        self.archive_model.set_schedule(rows, schedule)
+
+    def start_known_plaintext_attack(self):
+        """对选中的 ZipCrypto 压缩文件进行已知明文攻击"""
+        rows = self.archive_list.selected_rows()
+        if not rows:
+            return
+        archive_path = self.archive_model.path(rows[0])
+        if self.known_plaintext_thread and self.known_plaintext_thread.isRunning():
+            QMessageBox.warning(self, "警告", "已有已知明文攻击正在进行")
+            return
+        bkcrack_path = find_bkcrack(self.sevenz_path_edit.text() or "7z.exe")
+        if not bkcrack_path:
+            QMessageBox.warning(self, "警告", "未找到 bkcrack，请将 bkcrack 放在7z同目录或加入PATH")
+            return
+        try:
+            entries = zipcrypto_entries(archive_path)
+        except Exception as e:
+            QMessageBox.warning(self, "警告", f"无法读取ZIP文件: {str(e)}")
+            return
+        if not entries:
+            QMessageBox.warning(self, "警告", "该文件没有 ZipCrypto 加密的条目（AES加密不适用已知明文攻击）")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("已知明文攻击")
+        form = QFormLayout()
+        entry_combo = QComboBox()
+        entry_combo.addItems(entries)
+        entry_combo.setToolTip("已有其原始文件（或部分内容）的加密条目")
+        plain_layout = QHBoxLayout()
+        plain_edit = QLineEdit()
+        plain_edit.setPlaceholderText("条目的未加密副本；条目经过压缩时选择用相同方式压缩的ZIP")
+        browse_plain_btn = QPushButton("浏览...")
+        browse_plain_btn.clicked.connect(lambda: plain_edit.setText(
+            QFileDialog.getOpenFileName(dialog, "选择已知明文", "", "所有文件 (*.*)")[0] or plain_edit.text()))
+        plain_layout.addWidget(plain_edit)
+        plain_layout.addWidget(browse_plain_btn)
+        plain_entry_edit = QLineEdit()
+        plain_entry_edit.setPlaceholderText("明文为ZIP时，其中对应的条目名（默认与加密条目同名）")
+        offset_spin = QSpinBox()
+        offset_spin.setRange(0, 1 << 30)
+        offset_spin.setToolTip("已知明文在条目数据中的起始偏移")
+        known_hex_edit = QLineEdit()
+        known_hex_edit.setPlaceholderText("或直接填写已知字节（十六进制，至少12字节），如文件头")
+        output_edit = QLineEdit(os.path.splitext(archive_path)[0] + "_decrypted.zip")
+        output_edit.setToolTip("用恢复的密钥解密后的无密码副本，留空不解密")
+        password_spin = QSpinBox()
+        password_spin.setRange(0, 16)
+        password_spin.setValue(0)
+        password_spin.setSpecialValueText("不反推")
+        password_spin.setToolTip("由密钥反推密码的最大长度（可打印字符），长度越大越慢")
+        form.addRow("加密条目:", entry_combo)
+        form.addRow("已知明文文件:", plain_layout)
+        form.addRow("明文ZIP条目:", plain_entry_edit)
+        form.addRow("明文偏移:", offset_spin)
+        form.addRow("已知字节:", known_hex_edit)
+        form.addRow("解密输出:", output_edit)
+        form.addRow("反推密码长度:", password_spin)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(dialog.accept)
+        buttons.rejected.connect(dialog.reject)
+        form.addRow(buttons)
+        dialog.setLayout(form)
+
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        plain_path = plain_edit.text().strip()
+        known_hex = known_hex_edit.text().replace(" ", "")
+        try:
+            known_size = len(bytes.fromhex(known_hex))
+        except ValueError:
+            QMessageBox.warning(self, "警告", "已知字节不是有效的十六进制")
+            return
+        if plain_path and not os.path.isfile(plain_path):
+            QMessageBox.warning(self, "警告", "已知明文文件不存在")
+            return
+        plain_entry = ""
+        if plain_path and zipfile.is_zipfile(plain_path):
+            plain_entry = plain_entry_edit.text().strip() or entry_combo.currentText()
+        elif plain_path:
+            known_size += os.path.getsize(plain_path)
+        if not plain_entry and known_size < 12:
+            QMessageBox.warning(self, "警告", "已知明文至少需要12个字节（其中8个连续）")
+            return
+
+        attack = KnownPlaintextAttack(bkcrack_path, archive_path, entry_combo.currentText(),
+                                      plain_path, plain_entry, offset_spin.value(), known_hex)
+        self.known_plaintext_thread = KnownPlaintextThread(attack, output_edit.text().strip(),
+                                                           password_spin.value())
+        self.known_plaintext_thread.status_message.connect(self.update_status)
+        self.known_plaintext_thread.attack_finished.connect(self.known_plaintext_finished)
+        self.known_plaintext_thread.start()
+
+    def known_plaintext_finished(self, archive_path, keys, decrypted_path, password, error):
+        name = os.path.basename(archive_path)
+        if error:
+            self.update_status(f"{name}: 已知明文攻击失败: {error}")
+            return
+        if decrypted_path:
+            self.update_status(f"{name}: 已用密钥解密到 {decrypted_path}")
+        if password:
+            self.log_password(archive_path, password)
+            self.journal.mark_solved(archive_path)
+            self.password_found(archive_path, password)
+        elif decrypted_path:
+            self.statusBar().showMessage(f"已解密: {os.path.basename(decrypted_path)}", 10000)
+            QApplication.alert(self)
+
     def move_archive_item_up(self):
-        current_row = self.archive_list.currentRow()
-        if current_row > 0:
-            item = self.archive_list.takeItem(current_row)
-            self.archive_list.insertItem(current_row - 1, item)
-            self.archive_list.setCurrentRow(current_row - 1)
+        self.archive_list.move_current(-1)
 
     def move_archive_item_down(self):
-        current_row = self.archive_list.currentRow()
-        if current_row < self.archive_list.count() - 1:
-            item = self.archive_list.takeItem(current_row)
-            self.archive_list.insertItem(current_row + 1, item)
-            self.archive_list.setCurrentRow(current_row + 1)
+        self.archive_list.move_current(1)
 
     def toggle_archive_item_selection(self):
-        for item in self.archive_list.selectedItems():
-            if item.checkState() == Qt.Checked:
-                item.setCheckState(Qt.Unchecked)
-            else:
-                item.setCheckState(Qt.Checked)
+        self.archive_model.toggle_checked(self.archive_list.selected_rows())
 
     def add_dict_file(self):
         file_paths, _ = QFileDialog.getOpenFileNames(
             self, "选择字典文件", "",
-            "文本文件 (*.txt *.dic *.lst);;所有文件 (*.*)")
-        for file_path in file_paths:
-            self.add_dict_item(file_path)
+            "文本文件 (*.txt *.dic *.lst);;压缩字典 (*.7z *.gz *.bz2 *.xz *.lzma);;所有文件 (*.*)")
+        self.dict_model.add_entries([{"path": file_path} for file_path in file_paths])
 
     def add_dict_dir(self):
         dir_path = QFileDialog.getExistingDirectory(
@@ -1366,46 +4708,13 @@ class PasswordCrackerGUI(QMainWindow):
             self.add_dict_item(dir_path)
 
     def add_dict_item(self, path):
-        if not path:
-            return
-            
-        # 检查是否已存在
-        for i in range(self.dict_list.count()):
-            if self.dict_list.item(i).data(Qt.UserRole) == path:
-                return
-                
-        item = QListWidgetItem()
-        item.setData(Qt.UserRole, path)
-        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-        item.setCheckState(Qt.Checked)  # 默认选中
-        
-        # 设置显示文本、图标和颜色
-        size = 0
-        if os.path.isfile(path):
-            try:
-                size = os.path.getsize(path)
-                size_str = self.format_file_size(size)
-                item.setText(f"{os.path.basename(path)} ({size_str})")
-                item.setIcon(QIcon.fromTheme("text-x-generic"))
-            except:
-                item.setText(f"{os.path.basename(path)} (大小未知)")
-        elif os.path.isdir(path):
-            item.setText(f"{os.path.basename(path)} [目录]")
-            item.setIcon(QIcon.fromTheme("folder"))
-        
-        # 设置颜色
-        color = self.get_size_color(size)
-        item.setForeground(color)
-            
-        self.dict_list.addItem(item)
-
+        self.dict_model.add_entries([{"path": path}])
 
     def remove_selected_dicts(self):
-        for item in self.dict_list.selectedItems():
-            self.dict_list.takeItem(self.dict_list.row(item))
+        self.dict_model.remove_rows(self.dict_list.selected_rows())
 
     def clear_dict_list(self):
-        self.dict_list.clear()
+        self.dict_model.clear()
 
     def show_dict_list_context_menu(self, pos):
         menu = QMenu()
@@ -1468,6 +4777,14 @@ class PasswordCrackerGUI(QMainWindow):
         toggle_action.triggered.connect(self.toggle_dict_item_selection)
         menu.addAction(toggle_action)
         
+        pin_action = QAction("置顶/取消置顶(优先尝试)", self)
+        pin_action.triggered.connect(self.toggle_dict_item_pinned)
+        menu.addAction(pin_action)
+        
+        freq_action = QAction("按出现频率合并排序...", self)
+        freq_action.triggered.connect(self.sort_dicts_by_frequency)
+        menu.addAction(freq_action)
+        
         menu.addSeparator()
         
         remove_action = QAction("移除", self)
@@ -1479,104 +4796,49 @@ class PasswordCrackerGUI(QMainWindow):
 
     def sort_dict_items(self, by='name_asc'):
         """按指定方式排序字典列表"""
-        items = []
-        for i in range(self.dict_list.count()):
-            item = self.dict_list.item(i)
-            path = item.data(Qt.UserRole)
-            checked = item.checkState() == Qt.Checked
-            
-            # 获取文件信息
-            file_info = {
-                'item': item,
-                'path': path,
-                'name': os.path.basename(path),
-                'checked': checked,
-                'size': 0,
-                'mtime': 0,
-                'type': 'dir'  # 默认为目录
-            }
-            
-            if os.path.isfile(path):
-                try:
-                    stat = os.stat(path)
-                    file_info['size'] = stat.st_size
-                    file_info['mtime'] = stat.st_mtime
-                    file_info['type'] = os.path.splitext(path)[1].lower()  # 文件扩展名
-                except:
-                    pass
-            elif os.path.isdir(path):
-                file_info['type'] = 'dir'
-            
-            items.append(file_info)
-        
-        # 根据排序方式排序
-        if by == 'name_asc':
-            items.sort(key=lambda x: x['name'].lower())
-        elif by == 'name_desc':
-            items.sort(key=lambda x: x['name'].lower(), reverse=True)
-        elif by == 'size_asc':
-            items.sort(key=lambda x: (x['size'], x['name'].lower()))
-        elif by == 'size_desc':
-            items.sort(key=lambda x: (-x['size'], x['name'].lower()))
-        elif by == 'mtime_asc':
-            items.sort(key=lambda x: (x['mtime'], x['name'].lower()))
-        elif by == 'mtime_desc':
-            items.sort(key=lambda x: (-x['mtime'], x['name'].lower()))
-        elif by == 'type':
-            items.sort(key=lambda x: (x['type'], x['name'].lower()))
-        
-        # 重新添加项目（带颜色）
-        self.dict_list.clear()
-        for item_data in items:
-            item = item_data['item']
-            path = item_data['path']
-            
-            # 创建新项目（保持原有显示格式）
-            new_item = QListWidgetItem()
-            new_item.setData(Qt.UserRole, path)
-            new_item.setFlags(new_item.flags() | Qt.ItemIsUserCheckable)
-            new_item.setCheckState(Qt.Checked if item_data['checked'] else Qt.Unchecked)
-            
-            # 设置颜色 
-            color = self.get_size_color(item_data['size'])
-            new_item.setForeground(color)
-            
-            if os.path.isfile(path):
-                size_str = self.format_file_size(item_data['size'])
-                mtime_str = datetime.fromtimestamp(item_data['mtime']).strftime('%Y-%m-%d %H:%M')
-                new_item.setText(f"{os.path.basename(path)} ({size_str}, {mtime_str})")
-                new_item.setIcon(QIcon.fromTheme("text-x-generic"))
-            elif os.path.isdir(path):
-                new_item.setText(f"{os.path.basename(path)} [目录]")
-                new_item.setIcon(QIcon.fromTheme("folder"))
-                
-            self.dict_list.addItem(new_item)
-
+        self.dict_model.sort_by(by)
 
+    def move_dict_item_up(self):
+        self.dict_list.move_current(-1)
 
+    def move_dict_item_down(self):
+        self.dict_list.move_current(1)
 
+    def toggle_dict_item_selection(self):
+        self.dict_model.toggle_checked(self.dict_list.selected_rows())
 
+    def toggle_dict_item_pinned(self):
+        self.dict_model.toggle_pinned(self.dict_list.selected_rows())
 
-    def move_dict_item_up(self):
-        current_row = self.dict_list.currentRow()
-        if current_row > 0:
-            item = self.dict_list.takeItem(current_row)
-            self.dict_list.insertItem(current_row - 1, item)
-            self.dict_list.setCurrentRow(current_row - 1)
+    def sort_dicts_by_frequency(self):
+        """将选中的字典按密码出现次数合并排序为新字典"""
+        dict_paths = [self.dict_model.path(row) for row in self.dict_list.selected_rows()
+                      if os.path.isfile(self.dict_model.path(row))]
+        if not dict_paths:
+            QMessageBox.warning(self, "警告", "请选择至少一个字典文件")
+            return
 
-    def move_dict_item_down(self):
-        current_row = self.dict_list.currentRow()
-        if current_row < self.dict_list.count() - 1:
-            item = self.dict_list.takeItem(current_row)
-            self.dict_list.insertItem(current_row + 1, item)
-            self.dict_list.setCurrentRow(current_row + 1)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "保存频率排序字典", f"freq_sorted_{timestamp}.txt",
+            "文本文件 (*.txt);;所有文件 (*.*)")
+        if not output_path:
+            return
 
-    def toggle_dict_item_selection(self):
-        for item in self.dict_list.selectedItems():
-            if item.checkState() == Qt.Checked:
-                item.setCheckState(Qt.Unchecked)
-            else:
-                item.setCheckState(Qt.Checked)
+        self.freq_sort_thread = FrequencySortThread(dict_paths, output_path,
+                                                    self.sevenz_path_edit.text() or "7z.exe")
+        self.freq_sort_thread.progress_updated.connect(
+            lambda current, total: self.update_status(f"频率统计: {current}/{total} 个字典"))
+        self.freq_sort_thread.sort_finished.connect(self.frequency_sort_finished)
+        self.freq_sort_thread.start()
+        self.update_status(f"开始按频率合并 {len(dict_paths)} 个字典...")
+
+    def frequency_sort_finished(self, output_path, count, error):
+        if error:
+            self.update_status(f"频率排序失败: {error}")
+            return
+        self.update_status(f"频率排序完成: {count} 个密码已写入 {output_path}")
+        self.add_dict_item(output_path)
 
     def save_settings(self):
         # 保存到QSettings
@@ -1584,35 +4846,25 @@ class PasswordCrackerGUI(QMainWindow):
         self.settings.setValue("thread_count", self.thread_spin.currentText())
         self.settings.setValue("recursive", self.recursive_check.isChecked())
         self.settings.setValue("ai_enabled", self.ai_enable_check.isChecked())
+        self.settings.setValue("priority_enabled", self.priority_check.isChecked())
+        self.settings.setValue("log_to_file", self.log_to_file_check.isChecked())
+        self.settings.setValue("async_verify", self.async_verify_check.isChecked())
+        self.settings.setValue("async_concurrency", self.async_concurrency_spin.value())
+        self.settings.setValue("pin_archives", self.pin_archives_check.isChecked())
+        self.settings.setValue("rules_enabled", self.rules_enable_check.isChecked())
+        self.settings.setValue("rules_path", self.rules_path_edit.text())
+        self.settings.setValue("mask_settings", json.dumps(self.get_mask_settings()))
         
         # 保存压缩文件列表
-        archive_items = []
-        for i in range(self.archive_list.count()):
-            item = self.archive_list.item(i)
-            archive_items.append({
-                "path": item.data(Qt.UserRole),
-                "checked": item.checkState() == Qt.Checked
-            })
+        archive_items = self.archive_model.records()
         self.settings.setValue("archive_items", json.dumps(archive_items))
         
         # 保存字典列表
-        dict_items = []
-        for i in range(self.dict_list.count()):
-            item = self.dict_list.item(i)
-            dict_items.append({
-                "path": item.data(Qt.UserRole),
-                "checked": item.checkState() == Qt.Checked
-            })
+        dict_items = self.dict_model.records()
         self.settings.setValue("dict_items", json.dumps(dict_items))
 
         # 保存AI字典列表（包括选中状态）
-        ai_dict_items = []
-        for i in range(self.ai_dict_list.count()):
-            item = self.ai_dict_list.item(i)
-            ai_dict_items.append({
-                "path": item.data(Qt.UserRole),
-                "checked": item.checkState() == Qt.Checked
-            })
+        ai_dict_items = self.ai_dict_model.records()
         self.settings.setValue("ai_dict_items", json.dumps(ai_dict_items))
 
         # 保存到配置文件
@@ -1621,6 +4873,14 @@ class PasswordCrackerGUI(QMainWindow):
             "thread_count": self.thread_spin.currentText(),
             "recursive": self.recursive_check.isChecked(),
             "ai_enabled": self.ai_enable_check.isChecked(),
+            "priority_enabled": self.priority_check.isChecked(),
+            "log_to_file": self.log_to_file_check.isChecked(),
+            "async_verify": self.async_verify_check.isChecked(),
+            "async_concurrency": self.async_concurrency_spin.value(),
+            "pin_archives": self.pin_archives_check.isChecked(),
+            "rules_enabled": self.rules_enable_check.isChecked(),
+            "rules_path": self.rules_path_edit.text(),
+            "mask_settings": self.get_mask_settings(),
             "archive_items": archive_items,
             "dict_items": dict_items,
             "ai_dict_items": ai_dict_items,
@@ -1630,9 +4890,9 @@ class PasswordCrackerGUI(QMainWindow):
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(config, f, ensure_ascii=False, indent=2)
-            self.status_display.append("配置已保存到文件")
+            self.status_log.append("配置已保存到文件")
         except Exception as e:
-            self.status_display.append(f"保存配置失败: {str(e)}")
+            self.status_log.append(f"保存配置失败: {str(e)}")
 
     def load_settings(self):
         # 尝试从配置文件加载
@@ -1648,79 +4908,29 @@ class PasswordCrackerGUI(QMainWindow):
                 self.recursive_check.setChecked(config.get("recursive", False))
                 self.ai_enable_check.setChecked(config.get("ai_enabled", False))
                 self.ai_count_spin.setValue(config.get("ai_count", 20000))
+                self.priority_check.setChecked(config.get("priority_enabled", True))
+                self.log_to_file_check.setChecked(config.get("log_to_file", False))
+                self.async_verify_check.setChecked(config.get("async_verify", False))
+                self.async_concurrency_spin.setValue(config.get("async_concurrency", 64))
+                self.pin_archives_check.setChecked(config.get("pin_archives", False))
+                self.rules_enable_check.setChecked(config.get("rules_enabled", False))
+                self.rules_path_edit.setText(config.get("rules_path", ""))
+                self.set_mask_settings(config.get("mask_settings", {}))
                 
                 # 加载压缩文件列表
-                self.archive_list.clear()
-                for item_data in config.get("archive_items", []):
-                    path = item_data["path"]
-                    item = QListWidgetItem(path)
-                    item.setData(Qt.UserRole, path)
-                    item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                    item.setCheckState(Qt.Checked if item_data.get("checked", True) else Qt.Unchecked)
-                    item.setIcon(QIcon.fromTheme("package-x-generic"))
-                    
-                    # 设置压缩文件颜色
-                    try:
-                        size = os.path.getsize(path)
-                        color = self.get_size_color(size)
-                        item.setForeground(color)
-                    except:
-                        pass
-                        
-                    self.archive_list.addItem(item)
+                self.archive_model.set_records(config.get("archive_items", []))
                 
                 # 加载字典列表
-                self.dict_list.clear()
-                for item_data in config.get("dict_items", []):
-                    path = item_data["path"]
-                    item = QListWidgetItem()
-                    item.setData(Qt.UserRole, path)
-                    item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                    item.setCheckState(Qt.Checked if item_data.get("checked", True) else Qt.Unchecked)
-                    
-                    size = 0
-                    if os.path.isfile(path):
-                        try:
-                            size = os.path.getsize(path)
-                            size_str = self.format_file_size(size)
-                            mtime_str = datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M')
-                            item.setText(f"{os.path.basename(path)} ({size_str}, {mtime_str})")
-                            item.setIcon(QIcon.fromTheme("text-x-generic"))
-                        except:
-                            item.setText(f"{os.path.basename(path)} (大小未知)")
-                    elif os.path.isdir(path):
-                        item.setText(f"{os.path.basename(path)} [目录]")
-                        item.setIcon(QIcon.fromTheme("folder"))
-                    
-                    # 设置颜色
-                    color = self.get_size_color(size)
-                    item.setForeground(color)
-                    
-                    self.dict_list.addItem(item)
+                self.dict_model.set_records(config.get("dict_items", []))
                 
                 # 加载AI字典列表
-                self.ai_dict_list.clear()
-                for item_data in config.get("ai_dict_items", []):
-                    if os.path.exists(item_data["path"]):
-                        item = QListWidgetItem(os.path.basename(item_data["path"]))
-                        item.setData(Qt.UserRole, item_data["path"])
-                        item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                        item.setCheckState(Qt.Checked if item_data.get("checked", True) else Qt.Unchecked)
-                        
-                        # 设置AI字典颜色
-                        try:
-                            size = os.path.getsize(item_data["path"])
-                            color = self.get_size_color(size)
-                            item.setForeground(color)
-                        except:
-                            pass
-                            
-                        self.ai_dict_list.addItem(item)
+                self.ai_dict_model.set_records(
+                    [item_data for item_data in config.get("ai_dict_items", []) if os.path.exists(item_data["path"])])
                 
-                self.status_display.append("配置已从文件加载")
+                self.status_log.append("配置已从文件加载")
                 return
         except Exception as e:
-            self.status_display.append(f"从文件加载配置失败: {str(e)}")
+            self.status_log.append(f"从文件加载配置失败: {str(e)}")
         
         # 如果文件加载失败，从QSettings加载
         sevenz_path = self.settings.value("sevenz_path", "7z.exe")
@@ -1736,124 +4946,111 @@ class PasswordCrackerGUI(QMainWindow):
         ai_enabled = self.settings.value("ai_enabled", False, type=bool)
         self.ai_enable_check.setChecked(ai_enabled)
         
+        self.priority_check.setChecked(self.settings.value("priority_enabled", True, type=bool))
+        self.log_to_file_check.setChecked(self.settings.value("log_to_file", False, type=bool))
+        self.async_verify_check.setChecked(self.settings.value("async_verify", False, type=bool))
+        self.async_concurrency_spin.setValue(self.settings.value("async_concurrency", 64, type=int))
+        self.pin_archives_check.setChecked(self.settings.value("pin_archives", False, type=bool))
+        self.rules_enable_check.setChecked(self.settings.value("rules_enabled", False, type=bool))
+        self.rules_path_edit.setText(self.settings.value("rules_path", ""))
+        self.set_mask_settings(json.loads(self.settings.value("mask_settings", "{}")))
+        
         # 加载压缩文件列表
-        self.archive_list.clear()
-        archive_items = json.loads(self.settings.value("archive_items", "[]"))
-        for item_data in archive_items:
-            path = item_data["path"]
-            item = QListWidgetItem(path)
-            item.setData(Qt.UserRole, path)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked if item_data.get("checked", True) else Qt.Unchecked)
-            item.setIcon(QIcon.fromTheme("package-x-generic"))
-            
-            # 设置压缩文件颜色
-            try:
-                size = os.path.getsize(path)
-                color = self.get_size_color(size)
-                item.setForeground(color)
-            except:
-                pass
-                
-            self.archive_list.addItem(item)
+        self.archive_model.set_records(json.loads(self.settings.value("archive_items", "[]")))
         
         # 加载字典列表
-        self.dict_list.clear()
-        dict_items = json.loads(self.settings.value("dict_items", "[]"))
-        for item_data in dict_items:
-            path = item_data["path"]
-            item = QListWidgetItem()
-            item.setData(Qt.UserRole, path)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked if item_data.get("checked", True) else Qt.Unchecked)
-            
-            size = 0
-            if os.path.isfile(path):
-                try:
-                    size = os.path.getsize(path)
-                    size_str = self.format_file_size(size)
-                    item.setText(f"{os.path.basename(path)} ({size_str})")
-                except:
-                    item.setText(f"{os.path.basename(path)} (大小未知)")
-                item.setIcon(QIcon.fromTheme("text-x-generic"))
-            elif os.path.isdir(path):
-                item.setText(f"{os.path.basename(path)} [目录]")
-                item.setIcon(QIcon.fromTheme("folder"))
-            
-            # 设置颜色
-            color = self.get_size_color(size)
-            item.setForeground(color)
-            
-            self.dict_list.addItem(item)
+        self.dict_model.set_records(json.loads(self.settings.value("dict_items", "[]")))
         
         # 加载AI字典列表（包括选中状态）
-        self.ai_dict_list.clear()
         ai_dict_items = json.loads(self.settings.value("ai_dict_items", "[]"))
-        for item_data in ai_dict_items:
-            if os.path.exists(item_data["path"]):
-                item = QListWidgetItem(os.path.basename(item_data["path"]))
-                item.setData(Qt.UserRole, item_data["path"])
-                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-                item.setCheckState(Qt.Checked if item_data.get("checked", True) else Qt.Unchecked)
-                
-                # 设置AI字典颜色
-                try:
-                    size = os.path.getsize(item_data["path"])
-                    color = self.get_size_color(size)
-                    item.setForeground(color)
-                except:
-                    pass
-                    
-                self.ai_dict_list.addItem(item)
-
-
+        self.ai_dict_model.set_records(
+            [item_data for item_data in ai_dict_items if os.path.exists(item_data["path"])])
+
+    def get_mask_settings(self):
+        return {
+            "enabled": self.mask_enable_check.isChecked(),
+            "mask": self.mask_edit.text(),
+            "charset1": self.mask_charset1_edit.text(),
+            "charset2": self.mask_charset2_edit.text(),
+            "increment": self.mask_increment_check.isChecked(),
+            "min_length": self.mask_min_length_spin.value(),
+            "mode": self.attack_mode_combo.currentData(),
+            "left_path": self.hybrid_left_edit.text(),
+            "right_path": self.hybrid_right_edit.text()
+        }
 
-    def save_resume_info(self):
+    def set_mask_settings(self, mask_settings):
+        self.mask_enable_check.setChecked(mask_settings.get("enabled", False))
+        self.mask_edit.setText(mask_settings.get("mask", ""))
+        self.mask_charset1_edit.setText(mask_settings.get("charset1", ""))
+        self.mask_charset2_edit.setText(mask_settings.get("charset2", ""))
+        self.mask_increment_check.setChecked(mask_settings.get("increment", False))
+        self.mask_min_length_spin.setValue(mask_settings.get("min_length", 1))
+        mode_index = self.attack_mode_combo.findData(mask_settings.get("mode", 'mask'))
+        if mode_index >= 0:
+            self.attack_mode_combo.setCurrentIndex(mode_index)
+        self.hybrid_left_edit.setText(mask_settings.get("left_path", ""))
+        self.hybrid_right_edit.setText(mask_settings.get("right_path", ""))
+
+    def has_resume_data(self):
+        return os.path.exists(self.resume_file) or self.journal.exists()
+
+    def collect_resume_data(self):
+        """收集当前任务列表和设置，作为恢复信息"""
         resume_data = {
-            "archive_items": [],
-            "dict_items": [],
+            "archive_items": self.archive_model.records(),
+            "dict_items": self.dict_model.records(),
             "resume_info": {},
             "thread_count": self.thread_spin.currentText(),
             "recursive": self.recursive_check.isChecked(),
             "ai_enabled": self.ai_enable_check.isChecked(),
+            "mask_settings": self.get_mask_settings(),
+            "rules_enabled": self.rules_enable_check.isChecked(),
+            "rules_path": self.rules_path_edit.text(),
+            "dict_paths": self.dict_model.checked_paths_pinned_first(),
             "sevenz_path": self.sevenz_path_edit.text()
         }
         
-        # 保存压缩文件列表
-        for i in range(self.archive_list.count()):
-            item = self.archive_list.item(i)
-            resume_data["archive_items"].append({
-                "path": item.data(Qt.UserRole),
-                "checked": item.checkState() == Qt.Checked
-            })
-        
-        # 保存字典列表
-        for i in range(self.dict_list.count()):
-            item = self.dict_list.item(i)
-            resume_data["dict_items"].append({
-                "path": item.data(Qt.UserRole),
-                "checked": item.checkState() == Qt.Checked
-            })
+        return resume_data
+
+    def save_resume_info(self):
+        # 按任务开始时的配置保存，任务运行中修改了界面也不影响恢复
+        if self.job_config:
+            resume_data = dict(self.job_config, resume_info={})
+        else:
+            resume_data = self.collect_resume_data()
         
         # 保存每个任务的恢复信息
         for archive_path, cracker in self.cracker_threads.items():
             if hasattr(cracker, 'resume_info'):
-                resume_data["resume_info"][archive_path] = cracker.resume_info
+                resume_data["resume_info"][archive_path] = dict(cracker.resume_info)
         
         try:
             with open(self.resume_file, 'w', encoding='utf-8') as f:
                 json.dump(resume_data, f, ensure_ascii=False, indent=2)
+            self.journal.compact()
         except Exception as e:
-            self.status_display.append(f"保存恢复信息失败: {str(e)}")
+            self.status_log.append(f"保存恢复信息失败: {str(e)}")
 
     def load_resume_info(self):
+        """加载恢复信息，并用检查点日志中更新的恢复点覆盖（程序崩溃时只有日志）"""
+        resume_data = None
         try:
             if os.path.exists(self.resume_file):
                 with open(self.resume_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    resume_data = json.load(f)
+            
+            journal_state = self.journal.load()
+            if resume_data is None:
+                # 只有日志：按日志第一条记录的任务配置重建（旧日志没有配置时才用当前界面设置）
+                resume_data = self.journal.load_config()
+                if resume_data is None and journal_state:
+                    resume_data = self.collect_resume_data()
+            if resume_data is not None:
+                merge_resume_info(resume_data, journal_state)
         except Exception as e:
-            self.status_display.append(f"加载恢复信息失败: {str(e)}")
-        return None
+            self.status_log.append(f"加载恢复信息失败: {str(e)}")
+        return resume_data
 
     def closeEvent(self, event):
         self.save_settings()
@@ -1863,20 +5060,80 @@ class PasswordCrackerGUI(QMainWindow):
                 if cracker.isRunning():
                     cracker.stop()
                     cracker.wait(2000)
+            self.journal.flush()
+        if self.scheduler:
+            self.scheduler.shutdown()
+        if self.async_verifier:
+            self.async_verifier.shutdown()
+        self.archive_pins.release_all()
 
         if hasattr(self, 'ai_learning_thread') and self.ai_learning_thread.isRunning():
             self.ai_learning_thread.stop()
             self.ai_learning_thread.wait(2000)
 
+        if self.archive_scan_thread and self.archive_scan_thread.isRunning():
+            self.archive_scan_thread.stop()
+            self.archive_scan_thread.wait(2000)
+
+        if self.known_plaintext_thread and self.known_plaintext_thread.isRunning():
+            self.known_plaintext_thread.stop()
+            self.known_plaintext_thread.wait(2000)
+
         event.accept()
 
     def log_password(self, archive_path, password):
         try:
-            with open(self.password_log_file, 'a', encoding='utf-8') as f:
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f"{timestamp} | {archive_path} | 密码: {password}\n")
+            self.password_log.record(archive_path, password)
         except Exception as e:
-            self.status_display.append(f"记录密码失败: {str(e)}")
+            self.status_log.append(f"记录密码失败: {str(e)}")
+
+    def load_priority_passwords(self):
+        """需要优先尝试的密码：本次运行中已找到的密码，以及（启用时）密码日志中的历史密码"""
+        passwords = list(self.session_hits)
+        if self.priority_check.isChecked():
+            passwords += [password for password in read_found_passwords(self.password_log_file)
+                          if password not in self.session_hits]
+        if passwords:
+            self.status_log.append(f"将优先尝试 {len(passwords)} 个历史密码")
+        return passwords
+
+    def create_scheduler(self, max_threads, archive_paths, old_crackers=()):
+        """创建全局调度器，所有压缩文件共享 max_threads 个工作线程"""
+        if self.scheduler:
+            running = [cracker for cracker in old_crackers if cracker.isRunning()]
+            if running:
+                # 上一批破解线程停止前仍可能向旧调度器提交任务，等它们退出后再关闭
+                Thread(target=self.retire_scheduler, args=(self.scheduler, running), daemon=True).start()
+            else:
+                self.scheduler.shutdown()
+        self.scheduler = JobScheduler(max_threads)
+
+        start_time = time.time()
+        for archive_path in archive_paths:
+            schedule = self.archive_model.schedule_for_path(archive_path)
+            deadline_minutes = schedule.get("deadline_minutes", 0)
+            self.scheduler.register(
+                archive_path,
+                priority=schedule["priority"],
+                weight=schedule["weight"],
+                deadline=start_time + deadline_minutes * 60 if deadline_minutes else None
+            )
+
+    @staticmethod
+    def retire_scheduler(scheduler, crackers):
+        """在后台等待旧的破解线程全部退出，然后关闭它们使用的调度器"""
+        for cracker in crackers:
+            cracker.wait()
+        scheduler.shutdown()
+
+    def create_async_verifier(self):
+        """启用异步验证时创建共享的事件循环验证器"""
+        if self.async_verifier:
+            self.async_verifier.shutdown()
+            self.async_verifier = None
+        if self.async_verify_check.isChecked():
+            self.async_verifier = AsyncVerifier(self.async_concurrency_spin.value())
+            self.status_log.append(f"异步验证已启用，最多同时运行 {self.async_verifier.concurrency} 个验证进程")
 
     def start_cracking(self, selected_only=False):
         sevenz_path = self.sevenz_path_edit.text() or "7z.exe"
@@ -1887,14 +5144,17 @@ class PasswordCrackerGUI(QMainWindow):
             QMessageBox.warning(self, "警告", "7z.exe不存在")
             return
 
-        # 收集选中的压缩文件
+        # 收集选中的压缩文件（无加密、已解决的跳过，7z t 会让任意密码“通过”）
         archive_paths = []
-        for i in range(self.archive_list.count()):
-            item = self.archive_list.item(i)
-            if not selected_only or item.checkState() == Qt.Checked:
-                archive_path = item.data(Qt.UserRole)
+        solved_paths = []
+        for row in range(self.archive_model.rowCount()):
+            if self.archive_model.is_solved(row):
+                solved_paths.append(self.archive_model.path(row))
+                continue
+            if not selected_only or self.archive_model.is_checked(row):
+                archive_path = self.archive_model.path(row)
                 if not os.path.exists(archive_path):
-                    self.status_display.append(f"警告: 压缩文件不存在 {archive_path}")
+                    self.status_log.append(f"警告: 压缩文件不存在 {archive_path}")
                     continue
                 archive_paths.append(archive_path)
 
@@ -1902,31 +5162,50 @@ class PasswordCrackerGUI(QMainWindow):
             QMessageBox.warning(self, "警告", "请选择至少一个压缩文件")
             return
 
-        # 收集选中的字典路径
-        dict_paths = []
-        for i in range(self.dict_list.count()):
-            item = self.dict_list.item(i)
-            if item.checkState() == Qt.Checked:
-                dict_paths.append(item.data(Qt.UserRole))
+        # 收集选中的字典路径（置顶的字典排在前面）
+        dict_paths = self.dict_model.checked_paths_pinned_first()
 
-        if not dict_paths:
+        candidate_generator = None
+        if self.mask_enable_check.isChecked():
+            candidate_generator = self.create_candidate_generator()
+            if not candidate_generator:
+                QMessageBox.warning(self, "警告", "掩码/混合攻击设置无效")
+                return
+
+        if not dict_paths and not candidate_generator:
             QMessageBox.warning(self, "警告", "请选择至少一个字典文件或目录")
             return
 
-        self.status_display.clear()
-        self.status_display.append(f"开始破解 {len(archive_paths)} 个压缩文件")
-        self.status_display.append(f"使用7z路径: {sevenz_path}")
-        self.status_display.append(f"使用字典: {', '.join(dict_paths)}")
-        self.status_display.append(f"使用线程数: {max_threads}")
+        self.status_log.clear()
+        self.status_log.append(f"开始破解 {len(archive_paths)} 个压缩文件")
+        self.status_log.append(f"使用7z路径: {sevenz_path}")
+        self.status_log.append(f"使用字典: {', '.join(dict_paths)}")
+        self.status_log.append(f"使用线程数: {max_threads} (所有压缩文件共享)")
         if ai_enabled:
-            self.status_display.append("AI智能破解已启用")
+            self.status_log.append("AI智能破解已启用")
+        if candidate_generator:
+            # 混合/组合模式的候选数要读完字典才知道，由破解线程统计后通过 total_counted 报告
+            self.status_log.append(f"使用生成器: {candidate_generator.name}")
+        self.rule_engine = self.create_rule_engine()
+        priority_passwords = self.load_priority_passwords()
 
         # 停止任何正在运行的任务
         for cracker in self.cracker_threads.values():
             if cracker.isRunning():
                 cracker.stop()
+                cracker.wait(2000)
 
+        old_crackers = list(self.cracker_threads.values())
         self.cracker_threads = {}
+        self.journal.reset()  # 新任务，丢弃旧的检查点
+        self.job_config = self.collect_resume_data()
+        del self.job_config["resume_info"]
+        self.job_config["archive_paths"] = archive_paths  # 本次任务实际处理的压缩文件
+        self.journal.write_config(self.job_config)
+        if solved_paths:
+            self.journal.mark_solved_many(solved_paths)  # 任务开始后才把列表中的已解决标记写入日志
+        self.create_scheduler(max_threads, archive_paths, old_crackers)
+        self.create_async_verifier()
         
         # 启动每个压缩文件的破解任务
         for archive_path in archive_paths:
@@ -1937,12 +5216,21 @@ class PasswordCrackerGUI(QMainWindow):
                 sevenz_path,
                 max_workers=max_threads,
                 ai_enabled=ai_enabled,
-                ai_generator=self.ai_generator
+                ai_generator=self.ai_generator,
+                rule_engine=self.rule_engine,
+                candidate_generator=candidate_generator,
+                priority_passwords=priority_passwords,
+                journal=self.journal,
+                scheduler=self.scheduler,
+                password_log=self.password_log,
+                async_verifier=self.async_verifier,
+                archive_pins=self.archive_pins if self.pin_archives_check.isChecked() else None
             )
             
             cracker.password_found.connect(self.password_found)
             cracker.status_message.connect(self.update_status)
             cracker.finished.connect(self.cracking_finished)
+            cracker.total_counted.connect(self.update_total)
             
             self.cracker_threads[archive_path] = cracker
             cracker.start()
@@ -1962,6 +5250,10 @@ class PasswordCrackerGUI(QMainWindow):
             self.thread_spin.setCurrentIndex(thread_index)
         self.recursive_check.setChecked(resume_data.get("recursive", False))
         self.ai_enable_check.setChecked(resume_data.get("ai_enabled", False))
+        self.set_mask_settings(resume_data.get("mask_settings", {}))
+        if "rules_enabled" in resume_data:
+            self.rules_enable_check.setChecked(resume_data["rules_enabled"])
+            self.rules_path_edit.setText(resume_data.get("rules_path", ""))
 
         # 检查7z.exe是否存在
         sevenz_path = resume_data.get("sevenz_path", "7z.exe")
@@ -1970,57 +5262,37 @@ class PasswordCrackerGUI(QMainWindow):
             return
 
         # 恢复压缩文件列表
-        self.archive_list.clear()
-        for item_data in resume_data.get("archive_items", []):
-            item = QListWidgetItem(item_data["path"])
-            item.setData(Qt.UserRole, item_data["path"])
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked if item_data.get("checked", True) else Qt.Unchecked)
-            item.setIcon(QIcon.fromTheme("package-x-generic"))
-            self.archive_list.addItem(item)
+        self.archive_model.set_records(resume_data.get("archive_items", []))
 
         # 恢复字典列表
-        self.dict_list.clear()
-        for item_data in resume_data.get("dict_items", []):
-            path = item_data["path"]
-            item = QListWidgetItem()
-            item.setData(Qt.UserRole, path)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(Qt.Checked if item_data.get("checked", True) else Qt.Unchecked)
-            
-            if os.path.isfile(path):
-                try:
-                    size = os.path.getsize(path)
-                    size_str = self.format_file_size(size)
-                    item.setText(f"{os.path.basename(path)} ({size_str})")
-                except:
-                    item.setText(f"{os.path.basename(path)} (大小未知)")
-                item.setIcon(QIcon.fromTheme("text-x-generic"))
-            elif os.path.isdir(path):
-                item.setText(f"{os.path.basename(path)} [目录]")
-                item.setIcon(QIcon.fromTheme("folder"))
-                
-            self.dict_list.addItem(item)
+        self.dict_model.set_records(resume_data.get("dict_items", []))
 
-        self.status_display.clear()
-        self.status_display.append("恢复上次破解任务...")
+        self.status_log.clear()
+        self.status_log.append("恢复上次破解任务...")
+        self.rule_engine = self.create_rule_engine()
+        candidate_generator = self.create_candidate_generator() if self.mask_enable_check.isChecked() else None
 
         # 停止任何正在运行的任务
         for cracker in self.cracker_threads.values():
             if cracker.isRunning():
                 cracker.stop()
 
+        old_crackers = list(self.cracker_threads.values())
         self.cracker_threads = {}
         
         # 恢复每个压缩文件的破解任务
         resume_info = resume_data.get("resume_info", {})
-        dict_paths = [item.data(Qt.UserRole) for i in range(self.dict_list.count()) 
-                     if self.dict_list.item(i).checkState() == Qt.Checked]
+        self.create_scheduler(int(self.thread_spin.currentText()), list(resume_info.keys()), old_crackers)
+        self.create_async_verifier()
+        # 按保存的顺序恢复字典列表，恢复点按字典序号记录
+        dict_paths = resume_data.get("dict_paths") or self.dict_model.checked_paths_pinned_first()
+        self.job_config = {key: value for key, value in resume_data.items() if key != "resume_info"}
         ai_enabled = resume_data.get("ai_enabled", False)
+        priority_passwords = self.load_priority_passwords()
         
         for archive_path in resume_info.keys():
             if not os.path.exists(archive_path):
-                self.status_display.append(f"警告: 压缩文件不存在 {archive_path}")
+                self.status_log.append(f"警告: 压缩文件不存在 {archive_path}")
                 continue
 
             cracker = ArchiveCracker(
@@ -2031,12 +5303,21 @@ class PasswordCrackerGUI(QMainWindow):
                 resume_info[archive_path],
                 max_workers=int(self.thread_spin.currentText()),
                 ai_enabled=ai_enabled,
-                ai_generator=self.ai_generator
+                ai_generator=self.ai_generator,
+                rule_engine=self.rule_engine,
+                candidate_generator=candidate_generator,
+                priority_passwords=priority_passwords,
+                journal=self.journal,
+                scheduler=self.scheduler,
+                password_log=self.password_log,
+                async_verifier=self.async_verifier,
+                archive_pins=self.archive_pins if self.pin_archives_check.isChecked() else None
             )
             
             cracker.password_found.connect(self.password_found)
             cracker.status_message.connect(self.update_status)
             cracker.finished.connect(self.cracking_finished)
+            cracker.total_counted.connect(self.update_total)
             cracker.progress_updated.connect(self.update_progress_info)
             
             self.cracker_threads[archive_path] = cracker
@@ -2061,10 +5342,10 @@ class PasswordCrackerGUI(QMainWindow):
 
         if all_paused:
             self.pause_btn.setText("暂停")
-            self.status_display.append("继续所有任务...")
+            self.status_log.append("继续所有任务...")
         else:
             self.pause_btn.setText("继续")
-            self.status_display.append("暂停所有任务...")
+            self.status_log.append("暂停所有任务...")
 
     def stop_cracking(self):
         if not self.cracker_threads:
@@ -2075,39 +5356,54 @@ class PasswordCrackerGUI(QMainWindow):
             if cracker.isRunning():
                 cracker.stop()
         
-        self.status_display.append("正在停止所有任务...")
-        self.resume_btn.setEnabled(os.path.exists(self.resume_file))
+        self.status_log.append("正在停止所有任务...")
+        self.resume_btn.setEnabled(self.has_resume_data())
         self.update_control_buttons()
 
     def password_found(self, archive_path, password):
-        self.status_display.append(f"{archive_path}: 密码找到: {password}")
-        self.log_password(archive_path, password)
-        
-        # 显示密码找到的对话框
-        msg = QMessageBox()
-        msg.setIcon(QMessageBox.Information)
-        msg.setWindowTitle("密码找到")
-        msg.setText(f"文件: {archive_path}")
-        msg.setInformativeText(f"密码: {password}\n\n已记录到日志文件")
-        
-        # 添加复制密码按钮
-        copy_btn = msg.addButton("复制密码", QMessageBox.ActionRole)
-        save_btn = msg.addButton("保存到字典", QMessageBox.ActionRole)
-        msg.addButton(QMessageBox.Ok)
-        
-        msg.exec_()
-        
-        if msg.clickedButton() == copy_btn:
-            clipboard = QApplication.clipboard()
-            clipboard.setText(password)
-            self.status_display.append("密码已复制到剪贴板")
-        elif msg.clickedButton() == save_btn:
-            self.add_to_dictionary(password)
-        
-        # 停止该文件的破解任务
+        """命中已由破解线程停止并落盘，这里只更新结果面板和提示，不弹模态对话框"""
+        self.status_log.append(f"{archive_path}: 密码找到: {password}")
+
+        row = self.results_table.rowCount()
+        self.results_table.insertRow(row)
+        self.results_table.setItem(row, 0, QTableWidgetItem(datetime.now().strftime("%H:%M:%S")))
+        self.results_table.setItem(row, 1, QTableWidgetItem(archive_path))
+        self.results_table.setItem(row, 2, QTableWidgetItem(password))
+        self.results_table.scrollToBottom()
+
+        self.statusBar().showMessage(f"密码找到: {os.path.basename(archive_path)} → {password}", 10000)
+        QApplication.alert(self)  # 任务栏闪烁提示，不抢焦点
+
+        # 同批压缩文件往往共用密码：立即交给其他未破解的任务优先尝试
+        if password in self.session_hits:
+            self.session_hits.remove(password)
+        self.session_hits.insert(0, password)
+        for path, cracker in self.cracker_threads.items():
+            if path != archive_path and cracker.isRunning() and not cracker.is_stopped():
+                cracker.inject_passwords([password])
+
+        # 停止该文件的破解任务（破解线程已自行停止，这里兜底）
         if archive_path in self.cracker_threads:
             self.cracker_threads[archive_path].stop()
 
+    def selected_result_password(self):
+        row = self.results_table.currentRow()
+        if row < 0:
+            QMessageBox.warning(self, "警告", "请先在破解结果中选择一行")
+            return None
+        return self.results_table.item(row, 2).text()
+
+    def copy_selected_result(self):
+        password = self.selected_result_password()
+        if password is not None:
+            QApplication.clipboard().setText(password)
+            self.status_log.append("密码已复制到剪贴板")
+
+    def save_selected_result(self):
+        password = self.selected_result_password()
+        if password is not None:
+            self.add_to_dictionary(password)
+
     def update_status(self, message):
         """改进状态显示，带时间戳和颜色"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -2120,14 +5416,19 @@ class PasswordCrackerGUI(QMainWindow):
         else:
             color = "#000000"  # 黑色
             
-        self.status_display.append(f'<font color="{color}">[{timestamp}] {message}</font>')
-        self.status_display.ensureCursorVisible()  # 自动滚动到底部
+        self.status_log.append_html(f'<font color="{color}">[{timestamp}] {html.escape(message)}</font>',
+                                    message)
 
 
     def cracking_finished(self, archive_path, success):
         if not success:
-            self.status_display.append(f"{archive_path}: 破解完成，未找到密码")
+            self.status_log.append(f"{archive_path}: 破解完成，未找到密码")
 
+        self.journal.flush()
+        if self.scheduler:
+            self.scheduler.unregister(archive_path)
+        if not any(cracker.isRunning() for cracker in self.cracker_threads.values()):
+            self.report_rule_stats()
         self.update_control_buttons()
 
     def update_active_tasks(self):
@@ -2139,8 +5440,9 @@ class PasswordCrackerGUI(QMainWindow):
         else:
             self.active_tasks_label.setText("当前任务: 无")
             
-        # 更新恢复按钮状态
-        self.resume_btn.setEnabled(os.path.exists(self.resume_file))
+        # 检查点日志定期落盘，并更新恢复按钮状态
+        self.journal.flush_if_due()
+        self.resume_btn.setEnabled(self.has_resume_data())
 
     def update_control_buttons(self):
         active_count = sum(1 for cracker in self.cracker_threads.values() if cracker.isRunning())
@@ -2162,13 +5464,15 @@ class PasswordCrackerGUI(QMainWindow):
 class AILearningThread(QThread):
     progress_updated = pyqtSignal(int, int)  # current, total
     learning_finished = pyqtSignal(bool, str)  # success, message
-    passwords_generated = pyqtSignal(list)  # list of generated passwords
+    passwords_saved = pyqtSignal(str, int)  # output_path, new password count
     
-    def __init__(self, dict_paths, generator, count=20000):
+    def __init__(self, dict_paths, generator, output_path, count=20000, seven_zip_path="7z.exe"):
         super().__init__()
         self.dict_paths = dict_paths
         self.generator = generator
+        self.output_path = output_path
         self.count = count
+        self.seven_zip_path = seven_zip_path
         self._stop_flag = False
         
     def stop(self):
@@ -2179,7 +5483,8 @@ class AILearningThread(QThread):
             # 学习阶段
             success = self.generator.learn_from_multiple_dictionaries(
                 self.dict_paths,
-                lambda current, total: self.progress_updated.emit(current, total)
+                lambda current, total: self.progress_updated.emit(current, total),
+                self.seven_zip_path
             )
             
             if self._stop_flag:
@@ -2190,29 +5495,156 @@ class AILearningThread(QThread):
                 self.learning_finished.emit(False, "学习失败: 样本不足或模式识别失败")
                 return
                 
-            # 生成阶段
-            passwords = []
+            # 生成阶段：分批生成并直接流式写入文件，不在内存中累积
             batch_size = min(1000, max(100, self.count // 100))
             
-            for i in range(0, self.count, batch_size):
-                if self._stop_flag:
-                    break
-                    
-                current_count = min(batch_size, self.count - i)
-                passwords.extend(self.generator.generate_passwords(current_count))
-                self.progress_updated.emit(i + current_count, self.count)
+            with StreamingPasswordWriter(self.output_path) as writer:
+                for i in range(0, self.count, batch_size):
+                    if self._stop_flag:
+                        break
+                        
+                    current_count = min(batch_size, self.count - i)
+                    writer.write_batch(self.generator.generate_passwords(current_count))
+                    self.progress_updated.emit(i + current_count, self.count)
                 
-            # 去重
-            unique_passwords = list(set(passwords))
-            self.passwords_generated.emit(unique_passwords)
-            self.learning_finished.emit(True, f"成功生成 {len(unique_passwords)} 个唯一密码")
+            self.passwords_saved.emit(self.output_path, writer.written)
+            self.learning_finished.emit(True, f"成功生成 {writer.written} 个唯一密码")
             
         except Exception as e:
             print(f"[DEBUG] AI学习发生错误: {str(e)}")
             self.learning_finished.emit(False, f"发生错误: {str(e)}")
 
 
+class FrequencySortThread(QThread):
+    progress_updated = pyqtSignal(int, int)  # current, total
+    sort_finished = pyqtSignal(str, int, str)  # output_path, count, error
+
+    def __init__(self, dict_paths, output_path, seven_zip_path="7z.exe"):
+        super().__init__()
+        self.sorter = FrequencySorter(dict_paths, output_path, seven_zip_path=seven_zip_path)
+        self._stop_flag = False
+
+    def stop(self):
+        self._stop_flag = True
+
+    def run(self):
+        try:
+            count = self.sorter.run(
+                lambda current, total: self.progress_updated.emit(current, total),
+                lambda: self._stop_flag)
+            self.sort_finished.emit(self.sorter.output_path, count, "")
+        except Exception as e:
+            self.sort_finished.emit(self.sorter.output_path, 0, str(e))
+
+
+class KnownPlaintextThread(QThread):
+    status_message = pyqtSignal(str)
+    attack_finished = pyqtSignal(str, list, str, str, str)  # archive_path, keys, 解密文件, 密码, 错误
+
+    def __init__(self, attack, output_path="", max_password_length=0):
+        super().__init__()
+        self.attack = attack
+        self.output_path = output_path
+        self.max_password_length = max_password_length
+        self._stop_flag = False
+
+    def stop(self):
+        self._stop_flag = True
+
+    def run(self):
+        archive_path = self.attack.archive_path
+        name = os.path.basename(archive_path)
+        emit = lambda line: self.status_message.emit(f"{name}: bkcrack: {line}")
+        stop_check = lambda: self._stop_flag
+        try:
+            self.status_message.emit(f"{name}: 已知明文攻击开始，目标条目 {self.attack.entry}")
+            keys = self.attack.recover_keys(emit, stop_check)
+            if not keys:
+                self.attack_finished.emit(archive_path, [], "", "", "停止" if self._stop_flag else "未能恢复内部密钥")
+                return
+            self.status_message.emit(f"{name}: 内部密钥 {' '.join(keys)}")
+
+            decrypted_path = ""
+            if self.output_path and not self._stop_flag:
+                if self.attack.decrypt_archive(keys, self.output_path, emit, stop_check):
+                    decrypted_path = self.output_path
+
+            password = ""
+            if self.max_password_length and not self._stop_flag:
+                self.status_message.emit(f"{name}: 由密钥反推密码（最长 {self.max_password_length} 位）")
+                password = self.attack.recover_password(keys, self.max_password_length,
+                                                        line_callback=emit, stop_check=stop_check) or ""
+            self.attack_finished.emit(archive_path, list(keys), decrypted_path, password, "")
+        except Exception as e:
+            self.attack_finished.emit(archive_path, [], "", "", str(e))
+
+
+class ArchiveScanThread(QThread):
+    batch_ready = pyqtSignal(list)  # [(路径, 元数据)]
+    progress_updated = pyqtSignal(int, int)  # 已遍历文件数, 已扫描压缩文件数
+    scan_finished = pyqtSignal(int, str)  # 已扫描压缩文件数, 错误
+
+    def __init__(self, dir_path, seven_zip_path, known_paths, batch_size=200, file_paths=None):
+        super().__init__()
+        self.dir_path = dir_path
+        self.file_paths = file_paths  # 直接选择的文件（不按扩展名过滤），为None时遍历 dir_path
+        self.seven_zip_path = seven_zip_path
+        self.known_paths = known_paths  # 列表中已有的路径，跳过不扫描
+        self.batch_size = batch_size
+        self._stop_flag = False
+
+    def stop(self):
+        self._stop_flag = True
+
+    def scan_batch(self, executor, paths):
+        metadata_list = list(executor.map(
+            lambda path: scan_archive_metadata(path, self.seven_zip_path), paths))
+        self.batch_ready.emit(list(zip(paths, metadata_list)))
+        return len(paths)
+
+    def candidate_paths(self):
+        """依次生成 (是否为压缩文件, 路径)"""
+        if self.file_paths is not None:
+            for path in self.file_paths:
+                yield True, path
+            return
+        for root, _, files in os.walk(self.dir_path):
+            for file in files:
+                yield file.lower().endswith(ARCHIVE_EXTENSIONS), os.path.join(root, file)
+
+    def run(self):
+        walked = scanned = 0
+        try:
+            pending = []
+            with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+                for is_archive, path in self.candidate_paths():
+                    if self._stop_flag:
+                        break
+                    walked += 1
+                    if not is_archive or path in self.known_paths:
+                        continue
+                    self.known_paths.add(path)
+                    pending.append(path)
+                    if len(pending) >= self.batch_size:
+                        scanned += self.scan_batch(executor, pending)
+                        pending = []
+                        self.progress_updated.emit(walked, scanned)
+                if pending and not self._stop_flag:
+                    scanned += self.scan_batch(executor, pending)
+            self.progress_updated.emit(walked, scanned)
+            self.scan_finished.emit(scanned, "")
+        except Exception as e:
+            self.scan_finished.emit(scanned, str(e))
+
+
 if __name__ == "__main__":
+    # 离线工具: python Password_Cracker_GUI.py --sort-by-frequency 输出文件 字典1 [字典2 ...]
+    if len(sys.argv) >= 4 and sys.argv[1] == "--sort-by-frequency":
+        count = FrequencySorter(sys.argv[3:], sys.argv[2]).run(
+            lambda current, total: print(f"已统计 {current}/{total} 个字典"))
+        print(f"已写出 {count} 个密码到 {sys.argv[2]}")
+        sys.exit(0)
+
     app = QApplication(sys.argv)
     
     # 检查7z.exe是否在当前目录
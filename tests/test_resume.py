@@ -0,0 +1,41 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Password_Cracker_GUI import CheckpointJournal, merge_resume_info
+
+
+def test_journal_only_resume_keeps_every_checked_archive(tmp_path):
+    journal = CheckpointJournal(str(tmp_path / "cracker_resume.journal"))
+    journal.write_config({
+        "archive_items": [
+            {"path": "a.zip", "checked": True},
+            {"path": "b.zip", "checked": True},
+            {"path": "c.zip", "checked": False},
+            {"path": "d.zip", "checked": True, "solved": True},
+        ],
+        "dict_paths": ["words.txt"],
+    })
+    journal.update("a.zip", "0", {"file": "words.txt", "line": 42})
+    journal.flush()
+
+    resume_data = merge_resume_info(journal.load_config(), journal.load())
+
+    assert resume_data["resume_info"] == {
+        "a.zip": {"0": {"file": "words.txt", "line": 42}},
+        "b.zip": {},
+    }
+
+
+def test_journal_only_resume_uses_job_archive_list(tmp_path):
+    journal = CheckpointJournal(str(tmp_path / "cracker_resume.journal"))
+    journal.write_config({
+        "archive_items": [{"path": "a.zip", "checked": False}, {"path": "b.zip", "checked": True}],
+        "archive_paths": ["a.zip", "b.zip"],
+    })
+    journal.mark_solved("b.zip")
+
+    resume_data = merge_resume_info(journal.load_config(), journal.load())
+
+    assert resume_data["resume_info"] == {"a.zip": {}}